@@ -1,13 +1,20 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from backend.changelists import IndexedSearchMixin, date_filter
+from backend.paginators import EstimatedCountPaginator
 from .models import User
 
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(IndexedSearchMixin, BaseUserAdmin):
     list_display = ('email', 'first_name', 'last_name', 'is_staff', 'date_joined')
-    list_filter = ('is_staff', 'is_superuser', 'is_active', 'date_joined')
-    search_fields = ('email', 'first_name', 'last_name')
+    list_filter = ('is_staff', 'is_superuser', 'is_active', date_filter('date_joined'))
+    # Range lookups on LOWER(field) so searches (including owner autocomplete) can use indexes
+    prefix_search_fields = ('email', 'first_name', 'last_name')
+    search_fields = prefix_search_fields
     ordering = ('-date_joined',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ('activate_users', 'deactivate_users')
 
     # 🔥 FIX: Mark non-editable fields as read-only
     readonly_fields = ('date_joined', 'last_login')
@@ -25,3 +32,13 @@ class UserAdmin(BaseUserAdmin):
             'fields': ('email', 'username', 'first_name', 'last_name', 'password1', 'password2'),
         }),
     )
+
+    @admin.action(description='Activate selected users')
+    def activate_users(self, request, queryset):
+        updated = queryset.update(is_active=True)
+        self.message_user(request, f"{updated} users activated.")
+
+    @admin.action(description='Deactivate selected users')
+    def deactivate_users(self, request, queryset):
+        updated = queryset.update(is_active=False)
+        self.message_user(request, f"{updated} users deactivated.")
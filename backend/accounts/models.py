@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser #it is built in base class for creating custom user models,we are importing it and overiding some fields to make our user
 from django.db import models
+from django.db.models.functions import Lower
 
 class User(AbstractUser):
     email = models.EmailField(unique=True)
@@ -11,6 +12,14 @@ class User(AbstractUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
     
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['-date_joined'], name='user_date_joined_idx'),
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+            models.Index(Lower('first_name'), name='user_first_name_lower_idx'),
+            models.Index(Lower('last_name'), name='user_last_name_lower_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.email})"
     
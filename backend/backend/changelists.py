@@ -0,0 +1,216 @@
+import datetime
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib import admin
+from django.db import models
+from django.db.models import Max, Min, Q
+from django.db.models.functions import Lower
+from django.db.models.lookups import Exact, GreaterThanOrEqual, LessThan
+from django.utils import formats, timezone
+
+# Related rows matched by id list before falling back to a subquery
+RELATED_ID_LIMIT = 1000
+
+
+def prefix_upper_bound(prefix):
+    """
+    The smallest string greater than every string starting with ``prefix``:
+    the prefix with its last character incremented. Returns None when there
+    is no such string (an empty prefix, or one of only U+10FFFF).
+    """
+    while prefix:
+        code = ord(prefix[-1]) + 1
+        if 0xD800 <= code < 0xE000:
+            # Surrogates cannot be encoded; skip to the next real character
+            code = 0xE000
+        if code <= 0x10FFFF:
+            return prefix[:-1] + chr(code)
+        prefix = prefix[:-1]
+    return None
+
+
+class IndexedSearchMixin:
+    """
+    ModelAdmin search that the database can answer from functional
+    ``Lower(field)`` indexes, which every searched field needs. istartswith
+    and iexact (what '^' and '=' search fields compile to) use a LIKE or
+    UPPER() that such an index cannot serve, so instead, with the term
+    lower-cased:
+
+    * prefix_search_fields become a range,
+      ``LOWER(field) >= term AND LOWER(field) < next(term)``; they match
+      the start of the value in any case, but not words further in;
+    * exact_search_fields become ``LOWER(field) = term``.
+
+    The upper bound increments the term's last character rather than
+    appending a sentinel like U+10FFFF, which MySQL's utf8mb3 cannot store
+    and non-binary collations do not sort last.
+
+    Fields through a foreign key (``owner__email``) are looked up on the
+    related table first and matched as ``owner_id IN (ids)``, so every
+    branch of the OR is an index lookup on the searched table; an
+    ``IN (SELECT ...)`` branch would make the database scan it instead.
+    Past RELATED_ID_LIMIT ids the subquery is used after all.
+
+    search_fields still has to be set (to either list) for the admin to
+    show the search box and to enable autocomplete.
+    """
+    prefix_search_fields = ()
+    exact_search_fields = ()
+
+    @property
+    def search_help_text(self):
+        opts = self.model._meta
+        parts = []
+        if self.prefix_search_fields:
+            parts.append(f'the start of {self._field_labels(opts, self.prefix_search_fields)} (any case)')
+        if self.exact_search_fields:
+            parts.append(f'the whole {self._field_labels(opts, self.exact_search_fields)} (any case)')
+        return f'Matches {", or ".join(parts)}. Words further into a field are not searched.'
+
+    def get_search_results(self, request, queryset, search_term):
+        term = ' '.join(search_term.split())
+        if not term:
+            return queryset, False
+        term = term.lower()
+        upper = prefix_upper_bound(term)
+        opts = queryset.model._meta
+
+        # Lookups keyed by the foreign key they go through ('' for the searched table)
+        lookups = defaultdict(Q)
+        for path in self.prefix_search_fields:
+            relation, field = self._split_relation(opts, path)
+            lookup = Q(GreaterThanOrEqual(Lower(field), term))
+            if upper is not None:
+                lookup &= Q(LessThan(Lower(field), upper))
+            lookups[relation] |= lookup
+        for path in self.exact_search_fields:
+            relation, field = self._split_relation(opts, path)
+            lookups[relation] |= Q(Exact(Lower(field), term))
+
+        condition = lookups.pop('', Q())
+        for relation, lookup in lookups.items():
+            related = opts.get_field(relation).related_model._base_manager.filter(lookup).values('pk')
+            ids = list(related.values_list('pk', flat=True)[:RELATED_ID_LIMIT + 1])
+            condition |= Q(**{f'{relation}__in': ids if len(ids) <= RELATED_ID_LIMIT else related})
+        return queryset.filter(condition), False
+
+    @staticmethod
+    def _split_relation(opts, path):
+        relation, _, rest = path.partition('__')
+        if rest:
+            field = opts.get_field(relation)
+            if not (field.many_to_one or field.one_to_one) or '__' in rest:
+                raise ValueError(f'{path}: only direct fields and one foreign key are supported')
+            return relation, rest
+        return '', path
+
+    @classmethod
+    def _field_labels(cls, opts, paths):
+        labels = []
+        for path in paths:
+            relation, field = cls._split_relation(opts, path)
+            if relation:
+                related = opts.get_field(relation)
+                labels.append(f'{related.verbose_name} {related.related_model._meta.get_field(field).verbose_name}')
+            else:
+                labels.append(str(opts.get_field(field).verbose_name))
+        return ', '.join(labels[:-1]) + (' or ' if len(labels) > 1 else '') + labels[-1]
+
+
+class DateDrillDownFilter(admin.SimpleListFilter):
+    """
+    Year, month and day drill-down for an indexed date column, in place of
+    date_hierarchy on large tables. date_hierarchy lists each level with
+    SELECT DISTINCT over a truncated date, which scans every row of the
+    period; the choices here run from MIN() to MAX() within the selected
+    period, which read the two ends of its index range. A month or day in
+    between with no rows is still listed. Use date_filter() to make one
+    for a field.
+
+    The parameter holds the selected period as YYYY, YYYY-MM or YYYY-MM-DD.
+    """
+    title = 'date'
+    field_name = None
+
+    def lookups(self, request, model_admin):
+        period = self.period()
+        queryset = model_admin.get_queryset(request).order_by()
+        choices = []
+        if period is not None:
+            start, end, level = period
+            if level == 'day':
+                # A day lists its month's days, with the day highlighted
+                start = start.replace(day=1)
+                end = self.next_period(start, 'month')
+                level = 'month'
+            queryset = self.filter_period(queryset, start, end)
+            choices.append((f'{start:%Y}', f'{start:%Y}'))
+            if level == 'month':
+                choices.append((f'{start:%Y-%m}', formats.date_format(start, 'YEAR_MONTH_FORMAT')))
+
+        bounds = queryset.aggregate(first=Min(self.field_name), last=Max(self.field_name))
+        if bounds['first'] is None:
+            return choices
+        first, last = bounds['first'], bounds['last']
+        if isinstance(first, datetime.datetime):
+            if timezone.is_aware(first):
+                first, last = timezone.localtime(first), timezone.localtime(last)
+            first, last = first.date(), last.date()
+
+        if period is None:
+            return [(str(year), str(year)) for year in range(last.year, first.year - 1, -1)]
+        if level == 'year':
+            return choices + [
+                (f'{start.year}-{month:02d}', formats.date_format(datetime.date(start.year, month, 1), 'YEAR_MONTH_FORMAT'))
+                for month in range(first.month, last.month + 1)
+            ]
+        return choices + [
+            (f'{day:%Y-%m-%d}', formats.date_format(day, 'MONTH_DAY_FORMAT'))
+            for day in (first + datetime.timedelta(days=n) for n in range((last - first).days + 1))
+        ]
+
+    def queryset(self, request, queryset):
+        period = self.period()
+        if period is None:
+            return queryset
+        return self.filter_period(queryset, period[0], period[1])
+
+    def period(self):
+        """The selected (start, end, level), end exclusive, or None."""
+        value = self.value() or ''
+        for fmt, level, length in (('%Y', 'year', 4), ('%Y-%m', 'month', 7), ('%Y-%m-%d', 'day', 10)):
+            if len(value) != length:
+                continue
+            try:
+                start = datetime.datetime.strptime(value, fmt).date()
+                return start, self.next_period(start, level), level
+            except (ValueError, OverflowError):
+                return None
+        return None
+
+    @staticmethod
+    def next_period(start, level):
+        if level == 'year':
+            return start.replace(year=start.year + 1)
+        if level == 'month':
+            return (start.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+        return start + datetime.timedelta(days=1)
+
+    def filter_period(self, queryset, start, end):
+        field = queryset.model._meta.get_field(self.field_name)
+        if isinstance(field, models.DateTimeField):
+            start = datetime.datetime.combine(start, datetime.time.min)
+            end = datetime.datetime.combine(end, datetime.time.min)
+            if settings.USE_TZ:
+                start, end = timezone.make_aware(start), timezone.make_aware(end)
+        return queryset.filter(**{f'{self.field_name}__gte': start, f'{self.field_name}__lt': end})
+
+
+def date_filter(field_name):
+    return type(f'{field_name.title().replace("_", "")}DateFilter', (DateDrillDownFilter,), {
+        'field_name': field_name,
+        'parameter_name': f'{field_name}_period',
+        'title': field_name.replace('_', ' '),
+    })
@@ -37,9 +37,12 @@ DJANGO_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
 ]
+# rest_framework_simplejwt is used only through REST_FRAMEWORK/SIMPLE_JWT below and
+# is deliberately not an installed app: registering it imports its models
+# module, which pulls in django.test (~40 ms) on every start. Add it back
+# together with rest_framework_simplejwt.token_blacklist if blacklisting is needed.
 THIRD_PARTY_APPS = [
     'rest_framework',
-    'rest_framework_simplejwt',
     'corsheaders',
     'django_filters',
 ]
@@ -133,6 +136,53 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Responsive widths written next to every uploaded property image
+MEDIA_IMAGE_WIDTHS = [320, 640]
+
+# Hand file transfer to the front server: None, 'x-accel-redirect' (nginx) or 'x-sendfile' (Apache/lighttpd)
+MEDIA_SERVE_BACKEND = os.environ.get('MEDIA_SERVE_BACKEND') or None
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
+# Chunked image uploads (properties/uploads.py)
+UPLOAD_TEMP_DIR = BASE_DIR / 'upload_tmp'
+UPLOAD_MAX_SIZE = 25 * 1024 * 1024
+UPLOAD_IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.webp', '.gif', '.avif']
+UPLOAD_SESSION_MAX_AGE_HOURS = 24
+
+# Sold listings untouched for this many days are moved to the archive tables
+PROPERTY_ARCHIVE_AFTER_DAYS = 90
+PROPERTY_ARCHIVE_BATCH_SIZE = 500
+
+# Outbox events are pruned after this many days
+PROPERTY_EVENTS_RETENTION_DAYS = 7
+
+# Detail-page view counting: repeat views by the same viewer within the
+# window count once; counts are flushed to the database every interval
+PROPERTY_VIEWS_ENABLED = True
+PROPERTY_VIEWS_DEDUP_WINDOW = 30 * 60
+PROPERTY_VIEWS_FLUSH_INTERVAL = 10
+PROPERTY_VIEWS_BATCH_SIZE = 500
+
+# Cold-start budget per entrypoint (wsgi, asgi, manage.py), checked by
+# `manage.py profile_startup`
+STARTUP_BUDGET_MS = 1000
+
+# Near-duplicate listings (properties/duplicates.py): minimum estimated
+# Jaccard similarity, and whether creating a duplicate is rejected rather
+# than recorded in its signature's cluster_id. Recording is the default:
+# similar listings of one building can be legitimately distinct.
+PROPERTY_DUPLICATE_THRESHOLD = 0.5
+PROPERTY_REJECT_DUPLICATES = False
+
+# Batch property lookups (properties/batch.py): ids per request and the
+# per-process cache of serialized properties
+PROPERTY_BATCH_MAX_IDS = 50
+PROPERTY_CACHE_TTL = 60
+PROPERTY_CACHE_MAX_ENTRIES = 10000
+
+# Location typeahead (properties/locations.py): seconds between full rebuilds
+LOCATION_INDEX_REBUILD_INTERVAL = 300
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -148,8 +198,41 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 20
+    'PAGE_SIZE': 20,
+    'DEFAULT_THROTTLE_CLASSES': [
+        'backend.throttling.CostWeightedThrottle',
+    ],
+    # Proxies in front of the app; the client address is the X-Forwarded-For
+    # entry the outermost one appended (Render runs one). 0 uses REMOTE_ADDR
+    # and ignores the header, for serving without a proxy.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 1)),
+}
+
+# Throttling (backend/throttling.py). Budgets are per endpoint scope: the
+# view's throttle_scope or its URL name, falling back to 'default'. Each
+# request costs 1, plus the extras below for searches and deep pages.
+THROTTLE_BUDGETS = {
+    'anon': {
+        'default': '300/min',
+        'property-list-create': '120/min',
+        'location-suggest': '600/min',
+        'login': '20/min',
+        'signup': '10/min',
+    },
+    'user': {
+        'default': '1200/min',
+        'property-list-create': '600/min',
+    },
+}
+THROTTLE_COSTS = {
+    'search': 4,            # ?search= runs icontains over three columns
+    'deep_page_start': 5,   # pages after this one cost extra...
+    'deep_page_step': 5,    # ...one more per this many pages
+    'max': 20,
 }
+# Share counters between workers through Redis (needs the optional redis
+# package); in-process counters otherwise
+THROTTLE_REDIS_URL = os.environ.get('THROTTLE_REDIS_URL')
 
 # Simple JWT
 SIMPLE_JWT = {
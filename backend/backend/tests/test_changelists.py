@@ -0,0 +1,108 @@
+import datetime
+
+from django.contrib.admin.sites import site
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from accounts.models import User
+from backend.changelists import date_filter, prefix_upper_bound
+from properties.models import Property, PropertyPurchase
+
+
+class IndexedSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            email='Asha.Rao@example.com', username='asha', first_name='Asha', last_name='Rao'
+        )
+        cls.other = User.objects.create_user(
+            email='vikram@example.com', username='vikram', first_name='Vikram', last_name='Shah'
+        )
+        for title, location, owner in [
+            ('Mumbai Heights', 'Andheri', cls.other),
+            ('Sea view flat', 'Mumbai', cls.other),
+            ('Flat in Navi Mumbai', 'Navi Mumbai', cls.owner),
+            ('MUMBAIKAR villa', 'Thane', cls.other),
+        ]:
+            Property.objects.create(title=title, location=location, owner=owner, price=1, area=1)
+
+    def search(self, model, term):
+        model_admin = site._registry[model]
+        queryset, may_have_duplicates = model_admin.get_search_results(None, model.objects.all(), term)
+        self.assertFalse(may_have_duplicates)
+        return queryset
+
+    def titles(self, term):
+        return sorted(self.search(Property, term).values_list('title', flat=True))
+
+    def test_prefix_match_ignores_case(self):
+        expected = ['MUMBAIKAR villa', 'Mumbai Heights', 'Sea view flat']
+        self.assertEqual(self.titles('mUmbai'), expected)
+        self.assertEqual(self.titles('MUMBAI'), expected)
+        self.assertEqual(self.titles('  mumbai '), expected)
+
+    def test_words_further_in_are_not_matched(self):
+        self.assertEqual(self.titles('heights'), [])
+        self.assertIn('Words further into a field are not searched', site._registry[Property].search_help_text)
+
+    def test_exact_match_on_related_email(self):
+        self.assertEqual(self.titles('asha.rao@example.com'), ['Flat in Navi Mumbai'])
+        self.assertEqual(self.titles('asha.rao@example'), [])
+
+    def test_related_prefix_field(self):
+        PropertyPurchase.objects.create(
+            property=Property.objects.get(title='Sea view flat'), buyer=self.owner, purchase_price=1
+        )
+        self.assertEqual(self.search(PropertyPurchase, 'sea').count(), 1)
+        self.assertEqual(self.search(PropertyPurchase, 'VIKRAM@example.com').count(), 0)
+
+    def test_user_search(self):
+        self.assertEqual(list(self.search(User, 'sha').values_list('username', flat=True)), ['vikram'])
+        self.assertEqual(list(self.search(User, 'ASHA.').values_list('username', flat=True)), ['asha'])
+
+    def test_prefix_upper_bound(self):
+        self.assertEqual(prefix_upper_bound('abc'), 'abd')
+        self.assertEqual(prefix_upper_bound('a퟿'), 'a')
+        self.assertEqual(prefix_upper_bound('a\U0010ffff'), 'b')
+        self.assertIsNone(prefix_upper_bound('\U0010ffff'))
+        self.assertIsNone(prefix_upper_bound(''))
+
+
+class DateDrillDownFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user(email='owner@example.com', username='owner', first_name='O', last_name='W')
+        days = [datetime.date(2023, 11, 30), datetime.date(2024, 2, 3), datetime.date(2024, 2, 27), datetime.date(2024, 5, 1)]
+        for day in days:
+            prop = Property.objects.create(title=str(day), location='Pune', owner=owner, price=1, area=1)
+            created = timezone.make_aware(datetime.datetime.combine(day, datetime.time(12)))
+            Property.objects.filter(pk=prop.pk).update(created_at=created)
+
+    def filter(self, value=None):
+        params = {'created_at_period': [value]} if value else {}
+        return date_filter('created_at')(RequestFactory().get('/'), params, Property, site._registry[Property])
+
+    def choices(self, value=None):
+        return [choice for choice, _ in self.filter(value).lookup_choices]
+
+    def apply(self, value):
+        return sorted(self.filter(value).queryset(None, Property.objects.all()).values_list('title', flat=True))
+
+    def test_years(self):
+        self.assertEqual(self.choices(), ['2024', '2023'])
+
+    def test_year_lists_months_between_first_and_last(self):
+        self.assertEqual(self.choices('2024'), ['2024', '2024-02', '2024-03', '2024-04', '2024-05'])
+        self.assertEqual(self.apply('2024'), ['2024-02-03', '2024-02-27', '2024-05-01'])
+
+    def test_month_and_day_drill_down(self):
+        choices = self.choices('2024-02')
+        self.assertEqual(choices[:3], ['2024', '2024-02', '2024-02-03'])
+        self.assertEqual(choices[-1], '2024-02-27')
+        self.assertEqual(self.apply('2024-02'), ['2024-02-03', '2024-02-27'])
+        self.assertEqual(self.apply('2024-02-27'), ['2024-02-27'])
+        self.assertEqual(self.choices('2024-02-27'), choices)
+
+    def test_invalid_period_is_ignored(self):
+        for value in ['abcd', '2024-13', '2024-02-30', '9999-12-31', '24']:
+            self.assertEqual(len(self.apply(value)), 4)
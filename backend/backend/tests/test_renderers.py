@@ -0,0 +1,62 @@
+import datetime
+import uuid
+from decimal import Decimal
+from unittest import mock, skipIf
+
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from accounts.models import User
+from backend import renderers
+from backend.renderers import FastJSONRenderer
+from properties.models import Property
+from properties.views import PropertyDetailView, PropertyListCreateView
+
+
+@skipIf(renderers.orjson is None, 'orjson is not installed')
+class FastJSONRendererTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user(email='owner@example.com', username='owner', first_name='Ōwner', last_name='Ü')
+        cls.property = Property.objects.create(
+            title='Villa near the sea "quoted"', price=Decimal('12500000.50'), location='Goa / Panjim',
+            area=1200, owner=owner, image='properties/villa.3f2a9c.jpg', image_widths=[320, 640],
+        )
+
+    def assertRendersAlike(self, data):
+        fast = FastJSONRenderer().render(data)
+        self.assertEqual(fast, JSONRenderer().render(data))
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertEqual(FastJSONRenderer().render(data), fast)
+
+    def test_decimal_and_datetime_values(self):
+        tz = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+        self.assertRendersAlike({
+            'price': Decimal('12500000.50'),
+            'small': Decimal('0.000001'),
+            'huge': Decimal('12345678901234567890'),
+            'drop_percent': 12.35,
+            'sum': 0.1 + 0.2,
+            'aware': datetime.datetime(2024, 2, 29, 23, 59, 59, 123456, tzinfo=tz),
+            'utc': datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc),
+            'naive': datetime.datetime(2024, 1, 1, 8, 30),
+            'date': datetime.date(2024, 1, 1),
+            'time': datetime.time(8, 30, 15, 250000),
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'nested': [{'text': 'नमस्ते ', 1: None, 'ok': True}],
+        })
+
+    def test_serialized_listing_responses(self):
+        factory = APIRequestFactory()
+        list_response = PropertyListCreateView.as_view()(factory.get('/api/properties/'))
+        detail_response = PropertyDetailView.as_view()(factory.get('/'), pk=self.property.pk)
+        for response in (list_response, detail_response):
+            self.assertEqual(response.status_code, 200)
+            self.assertRendersAlike(response.data)
+        self.assertIn(b'http://testserver/media/properties/villa.3f2a9c', FastJSONRenderer().render(detail_response.data))
+
+    def test_indented_output_uses_the_stock_renderer(self):
+        data = {'price': Decimal('1.50')}
+        context = 'application/json; indent=2'
+        self.assertEqual(FastJSONRenderer().render(data, context), JSONRenderer().render(data, context))
@@ -0,0 +1,70 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from backend import throttling
+from backend.throttling import LocalSlidingWindowStore, client_ip
+
+
+class ThrottledView(APIView):
+    permission_classes = [AllowAny]
+    throttle_scope = 'test'
+
+    def get(self, request):
+        return Response({})
+
+
+BUDGETS = {'anon': {'default': '100/min', 'test': '3/min'}, 'user': {'default': '100/min'}}
+
+
+@override_settings(THROTTLE_BUDGETS=BUDGETS, THROTTLE_REDIS_URL=None)
+class CostWeightedThrottleTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        patcher = mock.patch.object(throttling, '_store', LocalSlidingWindowStore())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, forwarded_for, remote_addr='10.0.0.1'):
+        request = self.factory.get('/', HTTP_X_FORWARDED_FOR=forwarded_for, REMOTE_ADDR=remote_addr)
+        return ThrottledView.as_view()(request)
+
+    def test_rotating_forwarded_for_does_not_reset_the_budget(self):
+        # The proxy appends the real client address after whatever the client sent
+        statuses = [self.get(f'198.51.100.{i}, 203.0.113.7').status_code for i in range(5)]
+        self.assertEqual(statuses, [200, 200, 200, 429, 429])
+
+    def test_clients_behind_the_proxy_get_separate_budgets(self):
+        for _ in range(3):
+            self.assertEqual(self.get('203.0.113.7').status_code, 200)
+        self.assertEqual(self.get('203.0.113.7').status_code, 429)
+        self.assertEqual(self.get('203.0.113.8').status_code, 200)
+
+    def test_client_ip_ignores_spoofed_entries(self):
+        request = self.factory.get('/', HTTP_X_FORWARDED_FOR='1.2.3.4, 203.0.113.7', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(client_ip(request), '203.0.113.7')
+        with override_settings(REST_FRAMEWORK={'NUM_PROXIES': 0}):
+            self.assertEqual(client_ip(request), '10.0.0.1')
+
+
+class LocalSlidingWindowStoreTests(SimpleTestCase):
+    def test_least_recently_hit_key_is_evicted(self):
+        store = LocalSlidingWindowStore()
+        store.max_keys = 2
+        store.hit('a', 1, 10, 60)
+        store.hit('b', 1, 10, 60)
+        store.hit('a', 1, 10, 60)
+        store.hit('c', 1, 10, 60)
+        self.assertEqual(list(store._counters), ['a', 'c'])
+
+    def test_denied_hits_are_not_counted(self):
+        store = LocalSlidingWindowStore()
+        self.assertEqual(store.hit('a', 6, 10, 60), (True, 0))
+        allowed, wait = store.hit('a', 6, 10, 60)
+        self.assertFalse(allowed)
+        self.assertGreater(wait, 0)
+        self.assertTrue(store.hit('a', 4, 10, 60)[0])
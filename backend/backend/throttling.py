@@ -0,0 +1,180 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.filters import SearchFilter
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+
+def parse_rate(rate):
+    """'120/min' -> (120, 60)"""
+    limit, period = rate.split('/')
+    return int(limit), DURATIONS[period]
+
+
+def retry_after(previous, current, elapsed, window, limit, cost):
+    """
+    Seconds until a request of ``cost`` fits under ``limit``, given the
+    previous and current window counts and the time elapsed in the current
+    window. The previous window's weight decays linearly to zero.
+    """
+    weight = 1 - elapsed / window
+    excess = previous * weight + current + cost - limit
+    if previous and excess <= previous * weight:
+        return excess * window / previous
+    # Not before the current window rolls over; then the current count decays
+    wait = window - elapsed
+    if current and current + cost > limit:
+        wait += window * (1 - (limit - cost) / current)
+    return max(wait, 0)
+
+
+def client_ip(request):
+    """
+    The client's address: the X-Forwarded-For entry added by the outermost of
+    REST_FRAMEWORK['NUM_PROXIES'] trusted proxies, or REMOTE_ADDR. Entries a
+    client puts in the header itself are ignored.
+    """
+    return BaseThrottle().get_ident(request)
+
+
+class LocalSlidingWindowStore:
+    """
+    In-process sliding-window counters. Each key keeps the counts for the
+    current and previous fixed window; the previous one is weighted by how
+    much of it still overlaps the sliding window. Keys are kept in
+    least-recently-hit order and the oldest is dropped once there are more
+    than max_keys, so eviction costs O(1) per hit.
+    """
+    max_keys = 100000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = OrderedDict()
+
+    def hit(self, key, cost, limit, window):
+        now = time.time()
+        index, elapsed = divmod(now, window)
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None or counter[0] < index - 1:
+                previous = current = 0
+            elif counter[0] == index - 1:
+                previous, current = counter[2], 0
+            else:
+                previous, current = counter[1], counter[2]
+            estimated = previous * (1 - elapsed / window) + current
+            allowed = estimated + cost <= limit
+            self._counters[key] = [index, previous, current + cost if allowed else current]
+            self._counters.move_to_end(key)
+            if len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+        if not allowed:
+            return False, retry_after(previous, current, elapsed, window, limit, cost)
+        return True, 0
+
+
+class RedisSlidingWindowStore:
+    """
+    Sliding-window counters shared between processes through a Redis
+    compatible server. The read-check-increment runs as one Lua script, so
+    concurrent workers cannot overshoot the limit.
+    """
+    script = """
+    local previous = tonumber(redis.call('GET', KEYS[1]) or '0')
+    local current = tonumber(redis.call('GET', KEYS[2]) or '0')
+    local cost = tonumber(ARGV[1])
+    local limit = tonumber(ARGV[2])
+    local weight = tonumber(ARGV[3])
+    if previous * weight + current + cost > limit then
+        return {0, previous, current}
+    end
+    current = redis.call('INCRBY', KEYS[2], cost)
+    redis.call('EXPIRE', KEYS[2], ARGV[4])
+    return {1, previous, current}
+    """
+
+    def __init__(self, url):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self._hit = self.client.register_script(self.script)
+
+    def hit(self, key, cost, limit, window):
+        now = time.time()
+        index, elapsed = divmod(now, window)
+        index = int(index)
+        weight = 1 - elapsed / window
+        allowed, previous, current = self._hit(
+            keys=[f'throttle:{key}:{index - 1}', f'throttle:{key}:{index}'],
+            args=[cost, limit, repr(weight), window * 2],
+        )
+        if allowed:
+            return True, 0
+        return False, retry_after(int(previous), int(current), elapsed, window, limit, cost)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                url = settings.THROTTLE_REDIS_URL
+                _store = RedisSlidingWindowStore(url) if url else LocalSlidingWindowStore()
+    return _store
+
+
+class CostWeightedThrottle(BaseThrottle):
+    """
+    Per-endpoint, cost-weighted throttle with separate budgets for anonymous
+    and authenticated clients.
+
+    The endpoint scope is the view's ``throttle_scope`` or, failing that, its
+    URL name; scopes missing from settings.THROTTLE_BUDGETS share the
+    'default' budget. Search queries and deep page numbers cost more than a
+    plain request (settings.THROTTLE_COSTS).
+    """
+
+    def allow_request(self, request, view):
+        user = request.user
+        kind = 'user' if user and user.is_authenticated else 'anon'
+        budgets = settings.THROTTLE_BUDGETS[kind]
+
+        scope = getattr(view, 'throttle_scope', None)
+        if scope is None and request.resolver_match is not None:
+            scope = request.resolver_match.url_name
+        if scope not in budgets:
+            scope = 'default'
+        limit, window = parse_rate(budgets[scope])
+
+        ident = user.pk if kind == 'user' else client_ip(request)
+        allowed, self.wait_seconds = get_store().hit(
+            f'{kind}:{scope}:{ident}', self.get_cost(request, view), limit, window
+        )
+        return allowed
+
+    def get_cost(self, request, view):
+        costs = settings.THROTTLE_COSTS
+        cost = 1
+        if request.method != 'GET':
+            return cost
+        params = request.query_params
+        search_param = SearchFilter.search_param
+        if params.get(search_param) and getattr(view, 'search_fields', None):
+            cost += costs['search']
+        page = params.get('page')
+        if page and page.isdigit() and int(page) > costs['deep_page_start']:
+            depth = int(page) - costs['deep_page_start']
+            cost += math.ceil(depth / costs['deep_page_step'])
+        return min(cost, costs['max'])
+
+    def wait(self):
+        return math.ceil(self.wait_seconds) if self.wait_seconds else None
@@ -1,13 +1,26 @@
 from django.contrib import admin
-from .models import Property, PropertyPurchase, PropertyFavorite
+from django.db import transaction
+from django.utils import timezone
+from backend.changelists import IndexedSearchMixin, date_filter
+from backend.paginators import EstimatedCountPaginator
+from .duplicates import index_properties
+from .models import ArchivedProperty, Property, PropertyEvent, PropertyPurchase, PropertyFavorite
 
 @admin.register(Property)
-class PropertyAdmin(admin.ModelAdmin):
+class PropertyAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ['title', 'owner', 'price', 'location', 'property_type', 'is_sold', 'is_featured', 'created_at']
-    list_filter = ['property_type', 'is_sold', 'is_featured', 'created_at']
-    search_fields = ['title', 'location', 'owner__email']
+    list_filter = ['property_type', 'is_sold', 'is_featured', date_filter('created_at')]
+    list_select_related = ['owner']
+    # Lookups on LOWER(field) so searches can use the lower(title)/lower(location)/lower(email) indexes
+    prefix_search_fields = ['title', 'location']
+    exact_search_fields = ['owner__email']
+    search_fields = prefix_search_fields + exact_search_fields
     list_editable = ['is_sold', 'is_featured']  # ✅ now both are present in list_display (and not first)
     readonly_fields = ['created_at', 'updated_at']
+    autocomplete_fields = ['owner']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['mark_sold', 'mark_available', 'mark_featured', 'unmark_featured']
     
     fieldsets = (
         ('Basic Information', {
@@ -28,15 +41,106 @@ class PropertyAdmin(admin.ModelAdmin):
         }),
     )
 
+    # Bulk actions run as a single UPDATE; updated_at is set by hand because
+    # auto_now only applies on save(), and outbox events are written in bulk
+    def _bulk_update(self, request, queryset, event_type='property.updated', **fields):
+        with transaction.atomic():
+            ids = list(queryset.values_list('pk', flat=True))
+            updated = Property.objects.filter(pk__in=ids).update(updated_at=timezone.now(), **fields)
+            PropertyEvent.record_many(event_type, Property.objects.filter(pk__in=ids))
+            if 'is_sold' in fields:
+                index_properties(Property.objects.filter(pk__in=ids))
+        self.message_user(request, f"{updated} properties updated.")
+
+    @admin.action(description='Mark selected properties as sold')
+    def mark_sold(self, request, queryset):
+        self._bulk_update(request, queryset.filter(is_sold=False), event_type='property.sold', is_sold=True)
+
+    @admin.action(description='Mark selected properties as available')
+    def mark_available(self, request, queryset):
+        self._bulk_update(request, queryset, is_sold=False)
+
+    @admin.action(description='Feature selected properties')
+    def mark_featured(self, request, queryset):
+        self._bulk_update(request, queryset, is_featured=True)
+
+    @admin.action(description='Stop featuring selected properties')
+    def unmark_featured(self, request, queryset):
+        self._bulk_update(request, queryset, is_featured=False)
+
 @admin.register(PropertyPurchase)
-class PropertyPurchaseAdmin(admin.ModelAdmin):
+class PropertyPurchaseAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ['property', 'buyer', 'purchase_price', 'status', 'purchase_date']
-    list_filter = ['status', 'purchase_date']
-    search_fields = ['property__title', 'buyer__email']
+    list_filter = ['status', date_filter('purchase_date')]
+    list_select_related = ['property', 'buyer']
+    prefix_search_fields = ['property__title']
+    exact_search_fields = ['buyer__email']
+    search_fields = prefix_search_fields + exact_search_fields
     readonly_fields = ['purchase_date']
+    raw_id_fields = ['property', 'archived_property', 'buyer']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['mark_approved', 'mark_completed', 'mark_cancelled']
+
+    def _set_status(self, request, queryset, status):
+        with transaction.atomic():
+            ids = list(queryset.values_list('pk', flat=True))
+            updated = PropertyPurchase.objects.filter(pk__in=ids).update(status=status)
+            PropertyEvent.record_many('purchase.updated', PropertyPurchase.objects.filter(pk__in=ids))
+        self.message_user(request, f"{updated} purchases marked as {status}.")
+
+    @admin.action(description='Mark selected purchases as approved')
+    def mark_approved(self, request, queryset):
+        self._set_status(request, queryset, 'approved')
+
+    @admin.action(description='Mark selected purchases as completed')
+    def mark_completed(self, request, queryset):
+        self._set_status(request, queryset, 'completed')
+
+    @admin.action(description='Mark selected purchases as cancelled')
+    def mark_cancelled(self, request, queryset):
+        self._set_status(request, queryset, 'cancelled')
 
 @admin.register(PropertyFavorite)
-class PropertyFavoriteAdmin(admin.ModelAdmin):
+class PropertyFavoriteAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ['user', 'property', 'created_at']
-    list_filter = ['created_at']
-    search_fields = ['user__email', 'property__title']
+    list_filter = [date_filter('created_at')]
+    list_select_related = ['user', 'property']
+    prefix_search_fields = ['property__title']
+    exact_search_fields = ['user__email']
+    search_fields = prefix_search_fields + exact_search_fields
+    raw_id_fields = ['user', 'property']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+@admin.register(ArchivedProperty)
+class ArchivedPropertyAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    list_display = ['title', 'owner', 'price', 'location', 'property_type', 'created_at', 'archived_at']
+    list_filter = ['property_type', date_filter('archived_at')]
+    list_select_related = ['owner']
+    prefix_search_fields = ['title', 'location']
+    exact_search_fields = ['owner__email']
+    search_fields = prefix_search_fields + exact_search_fields
+    raw_id_fields = ['owner']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(PropertyEvent)
+class PropertyEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'event_type', 'object_id', 'created_at']
+    list_filter = ['event_type']
+    search_fields = ['=object_id']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
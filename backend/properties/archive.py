@@ -0,0 +1,100 @@
+from collections import Counter
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import (
+    ArchivedProperty, ArchivedPropertyFavorite, ImageBlob, Property, PropertyEvent, PropertyFavorite,
+    PropertyPriceChange, PropertyPurchase, PropertyViewCount,
+)
+
+ARCHIVED_FIELDS = [
+    field.attname for field in ArchivedProperty._meta.concrete_fields if field.name not in ('archived_at', 'views')
+]
+
+# Set while archive_batch deletes the active rows, so the delete signal
+# handlers do not report the move as a deletion
+archiving = ContextVar('archiving', default=False)
+
+
+class ArchiveConflict(Exception):
+    """Some of the properties already have an archived copy; ``ids`` lists them."""
+
+    def __init__(self, ids):
+        super().__init__(f'Already archived: {", ".join(map(str, ids))}')
+        self.ids = ids
+
+
+def archivable_properties(older_than_days=None):
+    days = settings.PROPERTY_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = timezone.now() - timedelta(days=days)
+    return Property.objects.filter(is_sold=True, updated_at__lt=cutoff)
+
+
+def archive_batch(property_ids):
+    """
+    Move one batch of sold properties, their view counts, price history and
+    favorites into the archive tables, recording a property.archived event for each property. Must run
+    inside a transaction.
+
+    Raises ArchiveConflict, before changing anything, if an archived copy of
+    any of them already exists; the active row is never deleted without its
+    copy having been written.
+    """
+    rows = list(Property.objects.filter(pk__in=property_ids).values(*ARCHIVED_FIELDS))
+    existing = sorted(ArchivedProperty.objects.filter(pk__in=property_ids).values_list('pk', flat=True))
+    if existing:
+        raise ArchiveConflict(existing)
+    views = dict(PropertyViewCount.objects.filter(property_id__in=property_ids).values_list('property_id', 'views'))
+    ArchivedProperty.objects.bulk_create([ArchivedProperty(**row, views=views.get(row['id'], 0)) for row in rows])
+    # The archived copies take their own image references before the
+    # delete below releases the active rows' ones
+    blob_counts = Counter(row['image_blob_id'] for row in rows if row['image_blob_id'])
+    for blob_id, count in blob_counts.items():
+        ImageBlob.retain(blob_id, count)
+
+    favorites = PropertyFavorite.objects.filter(property_id__in=property_ids).values(
+        'id', 'user_id', 'property_id', 'created_at'
+    )
+    ArchivedPropertyFavorite.objects.bulk_create([ArchivedPropertyFavorite(**row) for row in favorites])
+
+    # Point purchases and price history at the cold copy before the delete
+    # clears (purchases) or cascades to (price history) property_id
+    PropertyPurchase.objects.filter(property_id__in=property_ids).update(
+        archived_property_id=F('property_id')
+    )
+    PropertyPriceChange.objects.filter(property_id__in=property_ids).update(
+        archived_property_id=F('property_id'), property=None
+    )
+    PropertyEvent.record_many('property.archived', Property.objects.filter(pk__in=property_ids))
+    token = archiving.set(True)
+    try:
+        Property.objects.filter(pk__in=property_ids).delete()
+    finally:
+        archiving.reset(token)
+
+
+def archive_sold_properties(older_than_days=None, batch_size=None, max_batches=None):
+    """
+    Archive sold properties in batches, one transaction per batch, yielding
+    the size of each batch. Every batch re-selects what is still eligible, so
+    an interrupted run can simply be started again.
+    """
+    batch_size = batch_size or settings.PROPERTY_ARCHIVE_BATCH_SIZE
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            candidates = archivable_properties(older_than_days).order_by('pk')
+            if connection.features.has_select_for_update_skip_locked:
+                candidates = candidates.select_for_update(skip_locked=True)
+            property_ids = list(candidates.values_list('pk', flat=True)[:batch_size])
+            if not property_ids:
+                return
+            archive_batch(property_ids)
+        batches += 1
+        yield len(property_ids)
+
@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models.functions import Coalesce
+
+from .models import ArchivedProperty, Property
+
+
+class PropertyCache:
+    """
+    Per-process identity map of serialized properties (PropertySerializer
+    or ArchivedPropertySerializer output), keyed by site and property id.
+    Entries are dropped when this process saves or deletes the property,
+    its archived copy or its owner; an owner's entries are found through an
+    index by owner id rather than a scan. Saves made by other workers and
+    bulk updates are picked up when the entry expires after
+    PROPERTY_CACHE_TTL seconds, which also bounds how stale ``views`` gets.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._sites = set()
+        self._by_owner = {}
+
+    def get_many(self, site, property_ids):
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for property_id in property_ids:
+                entry = self._entries.get((site, property_id))
+                if entry is None:
+                    continue
+                expires, _, data = entry
+                if expires <= now:
+                    self._remove((site, property_id))
+                    continue
+                self._entries.move_to_end((site, property_id))
+                found[property_id] = data
+        return found
+
+    def set_many(self, site, items):
+        """Cache ``items`` of (property id, owner id, data)."""
+        expires = time.monotonic() + settings.PROPERTY_CACHE_TTL
+        with self._lock:
+            self._sites.add(site)
+            for property_id, owner_id, data in items:
+                key = (site, property_id)
+                self._remove(key)
+                self._entries[key] = (expires, owner_id, data)
+                self._by_owner.setdefault(owner_id, set()).add(key)
+            while len(self._entries) > settings.PROPERTY_CACHE_MAX_ENTRIES:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, property_id):
+        with self._lock:
+            for site in self._sites:
+                self._remove((site, property_id))
+
+    def invalidate_owner(self, owner_id):
+        with self._lock:
+            for key in list(self._by_owner.get(owner_id, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sites.clear()
+            self._by_owner.clear()
+
+    def _remove(self, key):
+        # Called with the lock held
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._by_owner[entry[1]]
+        keys.discard(key)
+        if not keys:
+            del self._by_owner[entry[1]]
+
+
+property_cache = PropertyCache()
+
+
+def load_properties(property_ids, request):
+    """
+    Serialize the given properties, in the given order, from the cache or
+    else with one query for the properties and one for their owners. Ids
+    not found are looked up in the archive with one more query and served
+    as the detail endpoint serves them. Returns (results, missing ids).
+    """
+    # Imported here: this module is loaded with the signal handlers at startup
+    from .serializers import ArchivedPropertySerializer, PropertySerializer
+    
+    site = request.build_absolute_uri('/')
+    found = property_cache.get_many(site, property_ids)
+    wanted = [property_id for property_id in property_ids if property_id not in found]
+    if wanted:
+        properties = Property.objects.filter(pk__in=wanted).annotate(
+            views=Coalesce('view_count__views', 0)
+        ).prefetch_related('owner').order_by()
+        context = {'request': request}
+        loaded = [(obj.pk, obj.owner_id, PropertySerializer(obj, context=context).data) for obj in properties]
+        archived_ids = set(wanted).difference(property_id for property_id, _, _ in loaded)
+        if archived_ids:
+            archived = ArchivedProperty.objects.filter(pk__in=archived_ids).select_related('owner').order_by()
+            loaded += [(obj.pk, obj.owner_id, ArchivedPropertySerializer(obj, context=context).data) for obj in archived]
+        property_cache.set_many(site, loaded)
+        found.update((property_id, data) for property_id, _, data in loaded)
+    results = [found[property_id] for property_id in property_ids if property_id in found]
+    missing = [property_id for property_id in property_ids if property_id not in found]
+    return results, missing
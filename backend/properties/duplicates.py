@@ -0,0 +1,264 @@
+"""
+Near-duplicate listing detection with MinHash and locality-sensitive hashing.
+
+A listing's features are the word 3-grams of its title, description and
+location plus its price and area buckets. They are reduced to a MinHash
+signature of NUM_BINS values, using one hash per feature: the hash picks
+the bin and the value competes for that bin's minimum; empty bins borrow
+from their right neighbour. The signature is cut into BANDS bands of ROWS
+values. Two listings whose signatures agree on a whole band become
+candidates, and candidates are kept when the estimated Jaccard similarity
+reaches PROPERTY_DUPLICATE_THRESHOLD, their price and area buckets are
+adjacent, and their type, bedrooms and bathrooms are equal. Listings with
+fewer than MIN_SHINGLES word 3-grams are never duplicates: short generic
+texts ("2 bed flat") match each other too easily. The band keys of unsold
+listings are stored in PropertySignatureBand, so checking a listing costs
+an index lookup rather than a table scan.
+"""
+import math
+import re
+import struct
+from collections import defaultdict, namedtuple
+from hashlib import blake2b
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import PropertySignature, PropertySignatureBand
+
+NUM_BINS = 64
+BANDS = 16
+ROWS = NUM_BINS // BANDS
+SHINGLE_SIZE = 3
+MIN_SHINGLES = 8
+PRICE_STEP = 0.05
+AREA_STEP = 0.10
+# Candidates verified per lookup, and members compared per bucket while clustering
+MAX_CANDIDATES = 200
+MAX_BUCKET_CHECKS = 4
+
+TOKEN_RE = re.compile(r'\w+')
+PACKED = struct.Struct(f'<{NUM_BINS}I')
+EMPTY = 1 << 32
+# Odd constant added per step when an empty bin borrows a neighbour's value
+ROTATION = 0x9E3779B1
+
+# Property fields a signature is computed from, in compute_signature's order
+SIGNATURE_FIELDS = ('title', 'description', 'location', 'price', 'area', 'property_type', 'bedrooms', 'bathrooms')
+# Fields whose change means index_properties has to run again
+INDEXED_FIELDS = (*SIGNATURE_FIELDS, 'is_sold')
+
+Signature = namedtuple(
+    'Signature', 'minhash price_bucket area_bucket shingle_count property_type bedrooms bathrooms'
+)
+# The columns of PropertySignature that make up a Signature, in order
+SIGNATURE_COLUMNS = Signature._fields
+
+
+def log_bucket(value, step):
+    value = float(value or 0)
+    return math.floor(math.log(value) / math.log1p(step)) if value > 0 else -1
+
+
+def shingles(title, description, location, price, area):
+    tokens = TOKEN_RE.findall(f'{title} {description} {location}'.casefold())
+    features = {' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(max(len(tokens) - SHINGLE_SIZE + 1, 1))}
+    features.add(f'price:{log_bucket(price, PRICE_STEP)}')
+    features.add(f'area:{log_bucket(area, AREA_STEP)}')
+    return features
+
+
+def minhash(features):
+    bins = [EMPTY] * NUM_BINS
+    for feature in features:
+        value = int.from_bytes(blake2b(feature.encode(), digest_size=8).digest(), 'little')
+        index, value = value % NUM_BINS, value >> 32
+        if value < bins[index]:
+            bins[index] = value
+    signature = list(bins)
+    for index, value in enumerate(bins):
+        if value == EMPTY:
+            for distance in range(1, NUM_BINS):
+                borrowed = bins[(index + distance) % NUM_BINS]
+                if borrowed != EMPTY:
+                    signature[index] = (borrowed + distance * ROTATION) & 0xFFFFFFFF
+                    break
+    return PACKED.pack(*signature)
+
+
+def compute_signature(title, description, location, price, area, property_type, bedrooms, bathrooms):
+    features = shingles(title, description, location, price, area)
+    return Signature(
+        minhash(features),
+        log_bucket(price, PRICE_STEP),
+        log_bucket(area, AREA_STEP),
+        # Less the price and area features
+        len(features) - 2,
+        property_type,
+        bedrooms,
+        bathrooms,
+    )
+
+
+def stored_signature(row):
+    """A Signature from a row of PropertySignature.values_list(*SIGNATURE_COLUMNS)."""
+    return Signature(bytes(row[0]), *row[1:])
+
+
+def band_values(packed):
+    width = ROWS * 4
+    return [packed[band * width:(band + 1) * width] for band in range(BANDS)]
+
+
+def band_keys(packed):
+    """One signed 64-bit key per band, as stored in PropertySignatureBand.bucket."""
+    return [
+        int.from_bytes(blake2b(bytes([band]) + value, digest_size=8).digest(), 'little', signed=True)
+        for band, value in enumerate(band_values(packed))
+    ]
+
+
+def similarity(packed, other):
+    return sum(a == b for a, b in zip(PACKED.unpack(packed), PACKED.unpack(other))) / NUM_BINS
+
+
+def is_duplicate(signature, other, threshold=None):
+    threshold = settings.PROPERTY_DUPLICATE_THRESHOLD if threshold is None else threshold
+    return (
+        signature.shingle_count >= MIN_SHINGLES
+        and other.shingle_count >= MIN_SHINGLES
+        and signature.property_type == other.property_type
+        and signature.bedrooms == other.bedrooms
+        and signature.bathrooms == other.bathrooms
+        and abs(signature.price_bucket - other.price_bucket) <= 1
+        and abs(signature.area_bucket - other.area_bucket) <= 1
+        and similarity(signature.minhash, other.minhash) >= threshold
+    )
+
+
+def find_duplicates(signature, exclude=None):
+    """Ids of unsold indexed properties that look like duplicates of ``signature``."""
+    if signature.shingle_count < MIN_SHINGLES:
+        return []
+    candidates = PropertySignatureBand.objects.filter(bucket__in=band_keys(signature.minhash))
+    if exclude is not None:
+        candidates = candidates.exclude(property_id=exclude)
+    candidate_ids = list(candidates.values_list('property_id', flat=True).distinct()[:MAX_CANDIDATES])
+    # Bulk updates that sell a listing can leave its bands behind until it is reindexed
+    rows = PropertySignature.objects.filter(property_id__in=candidate_ids, property__is_sold=False).values_list(
+        'property_id', *SIGNATURE_COLUMNS
+    )
+    return sorted(row[0] for row in rows if is_duplicate(signature, stored_signature(row[1:])))
+
+
+def signature_for(obj):
+    return compute_signature(*(getattr(obj, name) for name in SIGNATURE_FIELDS))
+
+
+def is_indexed(obj, signature):
+    """Whether ``obj`` gets band keys, and so can be found as a duplicate."""
+    return not obj.is_sold and signature.shingle_count >= MIN_SHINGLES
+
+
+def index_properties(properties):
+    """
+    Store signatures for ``properties``, and band keys for those that are
+    unsold, replacing any they had. Used for single saves and by bulk
+    imports and bulk status changes, which do not send the post_save signal
+    that keeps the index current.
+    """
+    properties = list(properties)
+    signatures = {obj.pk: signature_for(obj) for obj in properties}
+    if not signatures:
+        return
+    banded = {obj.pk for obj in properties if is_indexed(obj, signatures[obj.pk])}
+    # MySQL upserts on any unique key and does not accept unique_fields
+    target = {'unique_fields': ['property']} if connection.features.supports_update_conflicts_with_target else {}
+    with transaction.atomic():
+        PropertySignature.objects.bulk_create(
+            [PropertySignature(property_id=pk, **sig._asdict()) for pk, sig in signatures.items()],
+            update_conflicts=True, update_fields=[*SIGNATURE_COLUMNS, 'updated_at'],
+            **target,
+        )
+        PropertySignatureBand.objects.filter(property_id__in=signatures).delete()
+        PropertySignatureBand.objects.bulk_create([
+            PropertySignatureBand(property_id=pk, bucket=key)
+            for pk, sig in signatures.items() if pk in banded for key in band_keys(sig.minhash)
+        ])
+
+
+def record_duplicates(obj):
+    """
+    Put an indexed property into the duplicate cluster of the properties it
+    matches, for when duplicates are recorded rather than rejected.
+    Returns the ids it matched.
+    """
+    matches = find_duplicates(signature_for(obj), exclude=obj.pk)
+    if matches:
+        existing = PropertySignature.objects.filter(property_id__in=matches, cluster_id__isnull=False)
+        cluster_id = min([obj.pk, *matches, *existing.values_list('cluster_id', flat=True)])
+        PropertySignature.objects.filter(property_id__in=[obj.pk, *matches]).update(cluster_id=cluster_id)
+    return matches
+
+
+def filter_duplicates(listings):
+    """
+    Split unsaved Property objects for a bulk import into (unique,
+    duplicates), checking them against the index and against each other.
+    ``duplicates`` holds (listing, ids of matching stored properties); a
+    listing that repeats an earlier one in the batch has an empty list.
+    """
+    unique, duplicates = [], []
+    accepted = [defaultdict(list) for _ in range(BANDS)]
+    for listing in listings:
+        signature = signature_for(listing)
+        bands = band_values(signature.minhash)
+        repeated = any(
+            is_duplicate(signature, other)
+            for band, value in enumerate(bands) for other in accepted[band].get(value, ())
+        )
+        matches = [] if repeated else find_duplicates(signature)
+        if repeated or matches:
+            duplicates.append((listing, matches))
+            continue
+        for band, value in enumerate(bands):
+            accepted[band][value].append(signature)
+        unique.append(listing)
+    return unique, duplicates
+
+
+def cluster_signatures(signatures, threshold=None):
+    """
+    Group a list of signatures into duplicate clusters. Returns the
+    union-find parent of each position; positions sharing a root are one
+    cluster. Bands are processed one at a time so only one band's buckets
+    are held in memory; each bucket compares a member against its first
+    MAX_BUCKET_CHECKS members.
+    """
+    threshold = settings.PROPERTY_DUPLICATE_THRESHOLD if threshold is None else threshold
+    parent = list(range(len(signatures)))
+
+    def find(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    width = ROWS * 4
+    for band in range(BANDS):
+        start, end = band * width, (band + 1) * width
+        buckets = {}
+        for index, signature in enumerate(signatures):
+            value = signature.minhash[start:end]
+            members = buckets.get(value)
+            if members is None:
+                buckets[value] = index
+                continue
+            if isinstance(members, int):
+                members = buckets[value] = [members]
+            for member in members:
+                if find(member) != find(index) and is_duplicate(signature, signatures[member], threshold):
+                    parent[find(index)] = find(member)
+            if len(members) < MAX_BUCKET_CHECKS:
+                members.append(index)
+    return [find(index) for index in range(len(signatures))]
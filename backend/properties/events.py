@@ -0,0 +1,104 @@
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EventConsumer, PropertyEvent
+
+
+class ClaimedEvents(list):
+    """A claimed batch; ``lease`` has to be passed back to acknowledge()."""
+
+    def __init__(self, events=(), lease=None):
+        super().__init__(events)
+        self.lease = lease
+
+
+def assign_sequences(limit=1000):
+    """
+    Give committed events that do not have a sequence yet the next sequence
+    numbers, in id order. Returns the number sequenced.
+
+    Only rows whose transaction has committed are visible here, so an event
+    that commits after a consumer has read past its id still gets a sequence
+    after that consumer's position instead of being skipped. The sequencer
+    row is locked so concurrent callers hand out disjoint ranges.
+    """
+    with transaction.atomic():
+        sequencer, _ = EventConsumer.objects.select_for_update().get_or_create(name=EventConsumer.SEQUENCER)
+        pending = list(PropertyEvent.objects.filter(sequence__isnull=True).order_by('pk')[:limit])
+        if not pending:
+            return 0
+        for offset, event in enumerate(pending, start=1):
+            event.sequence = sequencer.position + offset
+        PropertyEvent.objects.bulk_update(pending, ['sequence'])
+        sequencer.position += len(pending)
+        sequencer.save(update_fields=['position', 'updated_at'])
+    return len(pending)
+
+
+def claim(consumer, limit=100, lease_seconds=30):
+    """
+    Claim up to ``limit`` events after the consumer's acknowledged position.
+
+    The claim takes a lease on the consumer so two workers sharing a name do
+    not process the same batch; it returns an empty list while another
+    worker's lease is live. The returned list's ``lease`` identifies this
+    claim to acknowledge().
+    """
+    assign_sequences()
+    now = timezone.now()
+    with transaction.atomic():
+        state, _ = EventConsumer.objects.select_for_update().get_or_create(name=consumer)
+        if state.lease_expires_at and state.lease_expires_at > now:
+            return ClaimedEvents()
+        events = list(
+            PropertyEvent.objects.filter(sequence__gt=state.position).order_by('sequence')[:limit]
+        )
+        if events:
+            state.lease_token = uuid.uuid4()
+            state.lease_expires_at = now + timedelta(seconds=lease_seconds)
+        else:
+            state.lease_token = state.lease_expires_at = None
+        state.save(update_fields=['lease_token', 'lease_expires_at', 'updated_at'])
+    return ClaimedEvents(events, state.lease_token)
+
+
+def acknowledge(consumer, sequence, lease):
+    """
+    Mark every event up to and including ``sequence`` as processed and
+    release the lease. Returns 0, leaving the position alone, if ``lease``
+    has expired or been taken over by another worker.
+    """
+    now = timezone.now()
+    return EventConsumer.objects.filter(
+        name=consumer, position__lte=sequence, lease_token=lease, lease_expires_at__gt=now
+    ).update(position=sequence, lease_token=None, lease_expires_at=None, updated_at=now)
+
+
+def seek(consumer, position):
+    """Move a consumer to ``position`` (forwards or back) so it resumes from there."""
+    EventConsumer.objects.update_or_create(
+        name=consumer, defaults={'position': position, 'lease_token': None, 'lease_expires_at': None}
+    )
+
+
+def position(consumer):
+    return EventConsumer.objects.filter(name=consumer).values_list('position', flat=True).first() or 0
+
+
+def prune(retention_days=None, batch_size=5000):
+    """Delete events older than the retention window, in batches. Returns the number removed."""
+    days = settings.PROPERTY_EVENTS_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = timezone.now() - timedelta(days=days)
+    removed = 0
+    while True:
+        ids = list(
+            PropertyEvent.objects.filter(created_at__lt=cutoff).order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return removed
+        removed += PropertyEvent.objects.filter(pk__in=ids).delete()[0]
@@ -0,0 +1,155 @@
+import heapq
+import os
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.db.models import Count
+
+from .models import Property
+
+# Prefix ranges up to this many locations are ranked by scanning them; wider
+# ones (short prefixes) keep a cached top list
+SCAN_LIMIT = 256
+MAX_SUGGESTIONS = 20
+WARM_PREFIX_LENGTH = 2
+
+
+def normalize_location(location):
+    return ' '.join(unicodedata.normalize('NFKC', location).casefold().split())
+
+
+class LocationIndex:
+    """
+    In-process prefix index of the distinct locations of unsold properties,
+    weighted by how many listings each has. Locations are kept normalized in
+    a sorted list so a prefix is a bisect away; property saves and deletes
+    adjust it as they commit, and a background thread builds it and then
+    rebuilds it from the database every LOCATION_INDEX_REBUILD_INTERVAL
+    seconds to pick up bulk updates and changes made by other workers.
+    Until the first build finishes, suggest() returns no suggestions.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._keys = []
+        self._counts = {}
+        self._labels = {}
+        self._top = {}
+        self._built = False
+        self._pid = None
+
+    def suggest(self, query, limit=10):
+        """Return up to ``limit`` (location, listing count) pairs starting with ``query``."""
+        self._ensure_started()
+        prefix = normalize_location(query)
+        if prefix and query[-1:].isspace():
+            prefix += ' '
+        limit = min(limit, MAX_SUGGESTIONS)
+        with self._lock:
+            keys, counts = self._keys, self._counts
+            lo = bisect_left(keys, prefix)
+            hi = bisect_left(keys, prefix + '\U0010ffff', lo)
+            if hi - lo <= SCAN_LIMIT:
+                ranked = heapq.nlargest(limit, keys[lo:hi], key=counts.__getitem__)
+            else:
+                ranked = self._top.get(prefix)
+                if ranked is None:
+                    ranked = self._top[prefix] = heapq.nlargest(MAX_SUGGESTIONS, keys[lo:hi], key=counts.__getitem__)
+                ranked = ranked[:limit]
+            return [(self._labels[key], counts[key]) for key in ranked]
+
+    def move(self, old_location, new_location):
+        """Move one listing from ``old_location`` to ``new_location``; either may be None."""
+        if not self._built:
+            return
+        with self._lock:
+            if old_location:
+                self._adjust(old_location, -1)
+            if new_location:
+                self._adjust(new_location, 1)
+
+    def _adjust(self, location, delta):
+        # Called with the lock held
+        key = normalize_location(location)
+        if not key:
+            return
+        count = self._counts.get(key, 0) + delta
+        if count > 0:
+            if key not in self._counts:
+                insort(self._keys, key)
+                self._labels[key] = ' '.join(location.split())
+            self._counts[key] = count
+        elif key in self._counts:
+            del self._keys[bisect_left(self._keys, key)]
+            del self._counts[key]
+            del self._labels[key]
+        for end in range(len(key) + 1):
+            self._top.pop(key[:end], None)
+
+    def load(self, rows):
+        """Replace the index with ``rows`` of (raw location, listing count)."""
+        counts = Counter()
+        spellings = defaultdict(Counter)
+        for location, count in rows:
+            key = normalize_location(location)
+            if key:
+                counts[key] += count
+                spellings[key][' '.join(location.split())] += count
+        keys = sorted(counts)
+        labels = {key: spellings[key].most_common(1)[0][0] for key in keys}
+        top = self._warm(keys, counts)
+        with self._lock:
+            self._keys, self._counts, self._labels, self._top = keys, dict(counts), labels, top
+            self._built = True
+
+    def rebuild(self):
+        rows = Property.objects.filter(is_sold=False).values_list('location').annotate(listings=Count('pk')).order_by()
+        self.load(rows)
+
+    def _warm(self, keys, counts):
+        # Rank the wide ranges of short prefixes up front, off the request path
+        top = {}
+        for length in range(WARM_PREFIX_LENGTH + 1):
+            start = 0
+            while start < len(keys):
+                prefix = keys[start][:length]
+                end = bisect_left(keys, prefix + '\U0010ffff', start)
+                if end - start > SCAN_LIMIT:
+                    top[prefix] = heapq.nlargest(MAX_SUGGESTIONS, keys[start:end], key=counts.__getitem__)
+                start = end
+        return top
+
+    def _ensure_started(self):
+        # The first query in a process starts the builder thread rather than
+        # building on the request path; forked workers start their own
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._build_lock:
+            if self._pid == pid:
+                return
+            thread = threading.Thread(target=self._run, name='location-index-rebuild', daemon=True)
+            thread.start()
+            self._pid = pid
+
+    def _run(self):
+        # An index inherited from the parent process is only refreshed on schedule
+        delay = settings.LOCATION_INDEX_REBUILD_INTERVAL if self._built else 0
+        while True:
+            time.sleep(delay)
+            delay = settings.LOCATION_INDEX_REBUILD_INTERVAL
+            try:
+                self.rebuild()
+            except DatabaseError:
+                pass
+            finally:
+                close_old_connections()
+
+
+location_index = LocationIndex()
@@ -0,0 +1,93 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from rest_framework.test import APIRequestFactory
+
+from properties.archive import ArchiveConflict, archivable_properties, archive_sold_properties
+from properties.models import Property
+from properties.views import PropertyListCreateView
+
+
+class Command(BaseCommand):
+    help = 'Move sold properties (and their favorites) into the archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=None,
+                            help='Defaults to settings.PROPERTY_ARCHIVE_AFTER_DAYS')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Defaults to settings.PROPERTY_ARCHIVE_BATCH_SIZE')
+        parser.add_argument('--max-batches', type=int, default=None)
+        parser.add_argument('--dry-run', action='store_true')
+        parser.add_argument('--measure', action='store_true',
+                            help='Report active-table size and listing latency before and after')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = archivable_properties(options['older_than_days']).count()
+            self.stdout.write(f'{count} properties would be archived')
+            return
+
+        if options['measure']:
+            self.report('before')
+
+        total = 0
+        try:
+            for archived in archive_sold_properties(
+                older_than_days=options['older_than_days'],
+                batch_size=options['batch_size'],
+                max_batches=options['max_batches'],
+            ):
+                total += archived
+                self.stdout.write(f'Archived batch of {archived} (total {total})')
+        except ArchiveConflict as exc:
+            raise CommandError(f'{exc} (archived {total} before stopping; the failed batch was rolled back)')
+        self.stdout.write(self.style.SUCCESS(f'Archived {total} properties'))
+
+        if options['measure']:
+            self.report('after')
+
+    def report(self, label):
+        rows = Property.objects.count()
+        size = self.table_size(Property._meta.db_table)
+        latency = self.listing_latency()
+        size_text = f'{size / 1024:.0f} KiB' if size is not None else 'n/a'
+        self.stdout.write(
+            f'[{label}] active rows={rows} table size={size_text} '
+            f'listing p50={latency:.2f} ms'
+        )
+
+    def table_size(self, table):
+        if connection.vendor == 'postgresql':
+            sql, params = 'SELECT pg_total_relation_size(%s)', [table]
+        elif connection.vendor == 'mysql':
+            sql = ('SELECT DATA_LENGTH + INDEX_LENGTH FROM information_schema.TABLES '
+                   'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s')
+            params = [table]
+        elif connection.vendor == 'sqlite':
+            # Needs SQLite built with the dbstat virtual table; counts the table and its indexes
+            sql = ('SELECT SUM(pgsize) FROM dbstat WHERE name = %s '
+                   'OR name IN (SELECT name FROM sqlite_master WHERE type = \'index\' AND tbl_name = %s)')
+            params = [table, table]
+        else:
+            return None
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                row = cursor.fetchone()
+        except DatabaseError:
+            return None
+        return row[0] if row else None
+
+    def listing_latency(self, runs=50):
+        factory = APIRequestFactory()
+        view = PropertyListCreateView.as_view()
+        timings = []
+        for _ in range(runs):
+            request = factory.get('/api/properties/')
+            started = time.perf_counter()
+            response = view(request)
+            response.render()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
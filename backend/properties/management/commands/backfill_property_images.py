@@ -0,0 +1,69 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from properties.models import ArchivedProperty, ImageBlob, Property
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-store images uploaded before content hashing: each legacy file is resized, stored '
+        'under its hash with responsive variants, and its rows get image_widths and an image blob. '
+        'Safe to re-run; rows that already have a blob are skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--keep-originals', action='store_true',
+                            help='Do not delete the legacy files once no row uses them')
+
+    def handle(self, *args, **options):
+        for model in (Property, ArchivedProperty):
+            stored = failed = 0
+            last_pk = 0
+            while True:
+                rows = list(
+                    model.objects.filter(pk__gt=last_pk, image_blob__isnull=True).exclude(image='')
+                    .exclude(image__isnull=True).order_by('pk').values_list('pk', 'image')[:options['batch_size']]
+                )
+                if not rows:
+                    break
+                last_pk = rows[-1][0]
+                by_name = defaultdict(list)
+                for pk, name in rows:
+                    by_name[name].append(pk)
+                for name, pks in by_name.items():
+                    if self.restore(model, name, pks, options['keep_originals']):
+                        stored += len(pks)
+                    else:
+                        failed += len(pks)
+            self.stdout.write(self.style.SUCCESS(
+                f'{model._meta.verbose_name_plural}: {stored} rows re-stored, {failed} skipped'
+            ))
+
+    def restore(self, model, name, pks, keep_originals):
+        storage = model._meta.get_field('image').storage
+        try:
+            with storage.open(name) as fileobj:
+                blob = ImageBlob.for_file(fileobj, name)
+        except (OSError, ValueError) as e:
+            self.stderr.write(f'  {name}: {e}')
+            return False
+
+        with transaction.atomic():
+            # Queryset update: re-storing the file is not a listing change, so
+            # no outbox event or price history row is written
+            updated = model.objects.filter(pk__in=pks, image=name, image_blob__isnull=True).update(
+                image=blob.file.name, image_widths=blob.image_widths, image_blob=blob,
+            )
+            if updated:
+                ImageBlob.retain(blob.pk, updated)
+
+        still_used = (
+            Property.objects.filter(image=name, image_blob__isnull=True).exists()
+            or ArchivedProperty.objects.filter(image=name, image_blob__isnull=True).exists()
+        )
+        if not keep_originals and name != blob.file.name and not still_used:
+            storage.delete(name)
+        return True
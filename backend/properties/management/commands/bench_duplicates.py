@@ -0,0 +1,111 @@
+import random
+import statistics
+import time
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand
+
+from properties.duplicates import (
+    SIGNATURE_COLUMNS, cluster_signatures, compute_signature, find_duplicates, stored_signature
+)
+from properties.models import PropertySignature
+
+
+def synthetic_listing(seed, vocabulary):
+    rng = random.Random(seed)
+    words = rng.choices(vocabulary, k=49)
+    return {
+        'title': ' '.join(words[:6]),
+        'description': ' '.join(words[6:46]),
+        'location': ' '.join(words[46:]),
+        'price': rng.randint(50000, 5000000),
+        'area': rng.randint(500, 5000),
+        'property_type': rng.choice(['house', 'apartment', 'condo', 'commercial']),
+        'bedrooms': rng.randint(0, 6),
+        'bathrooms': rng.randint(1, 4),
+    }
+
+
+def repost(listing, rng, vocabulary):
+    """The same listing re-posted with a word of the title and two of the description changed."""
+    title = listing['title'].split()
+    title[rng.randrange(len(title))] = rng.choice(vocabulary)
+    description = listing['description'].split()
+    for _ in range(2):
+        description[rng.randrange(len(description))] = rng.choice(vocabulary)
+    return dict(
+        listing, title=' '.join(title), description=' '.join(description),
+        price=int(listing['price'] * rng.uniform(0.98, 1.02)),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure near-duplicate detection on synthetic listings with planted re-posts: signature '
+        'and clustering throughput, cluster precision and recall, and index lookup latency'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--listings', type=int, default=1000000)
+        parser.add_argument('--duplicate-rate', type=float, default=0.05)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        count = options['listings']
+        rng = random.Random(options['seed'])
+        vocabulary = [''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=rng.randint(3, 9))) for _ in range(20000)]
+
+        # Listing i is original, or a re-post of an earlier original
+        labels, signatures, originals = [], [], []
+        elapsed = 0
+        for i in range(count):
+            if originals and rng.random() < options['duplicate_rate']:
+                original = rng.choice(originals)
+                listing = repost(synthetic_listing(original, vocabulary), rng, vocabulary)
+                labels.append(original)
+            else:
+                listing = synthetic_listing(i, vocabulary)
+                originals.append(i)
+                labels.append(i)
+            started = time.perf_counter()
+            signatures.append(compute_signature(**listing))
+            elapsed += time.perf_counter() - started
+        self.stdout.write(f'signatures: {count:,} listings in {elapsed:.1f} s ({count / elapsed:,.0f}/s)')
+
+        started = time.perf_counter()
+        roots = cluster_signatures(signatures)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'clustering: {elapsed:.1f} s ({count / elapsed:,.0f} listings/s)')
+
+        clusters = defaultdict(list)
+        for index, root in enumerate(roots):
+            clusters[root].append(labels[index])
+        clustered_pairs = true_pairs = 0
+        for members in clusters.values():
+            clustered_pairs += len(members) * (len(members) - 1) // 2
+            true_pairs += sum(n * (n - 1) // 2 for n in Counter(members).values())
+        planted = Counter(labels)
+        planted_pairs = sum(n * (n - 1) // 2 for n in planted.values())
+        precision = true_pairs / clustered_pairs if clustered_pairs else 1.0
+        recall = true_pairs / planted_pairs if planted_pairs else 1.0
+        self.stdout.write(
+            f'clusters: {sum(len(m) > 1 for m in clusters.values()):,}; '
+            f'pair precision {precision:.3f}, recall {recall:.3f} ({planted_pairs:,} planted pairs)'
+        )
+
+        # Index lookups against whatever this database has indexed
+        stored = list(PropertySignature.objects.order_by('?').values_list('property_id', *SIGNATURE_COLUMNS)[:500])
+        if not stored:
+            self.stdout.write('index lookup: no indexed properties; run cluster_duplicate_properties first')
+            return
+        timings = []
+        for property_id, *row in stored:
+            signature = stored_signature(row)
+            started = time.perf_counter()
+            find_duplicates(signature, exclude=property_id)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        self.stdout.write(
+            f'index lookup over {PropertySignature.objects.count():,} indexed properties: '
+            f'p50={statistics.median(timings):.2f} ms p99={timings[int(len(timings) * 0.99)]:.2f} ms'
+        )
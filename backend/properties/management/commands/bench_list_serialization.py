@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models.functions import Coalesce
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from backend import renderers
+from backend.renderers import FastJSONRenderer
+from properties.models import Property, PropertyFavorite
+from properties.rows import OwnerPropertyListRows, PropertyFavoriteRows, PropertyListRows
+from properties.serializers import (
+    OwnerPropertyListSerializer, PropertyFavoriteSerializer, PropertyListSerializer
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare rows/s of the DRF serializers and the value-tuple rows used by the list '
+        'endpoints, serializing and rendering the same rows, and check the JSON is identical'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        limit, repeat = options['rows'], options['repeat']
+        request = Request(APIRequestFactory().get('/api/properties/'))
+        properties = Property.objects.select_related('owner').annotate(views=Coalesce('view_count__views', 0))
+        favorites = PropertyFavorite.objects.select_related('property__owner')
+
+        cases = [
+            (
+                'property list',
+                lambda: PropertyListSerializer(list(properties[:limit]), many=True, context={'request': request}).data,
+                lambda: PropertyListRows(request).serialize(properties.values_list(*PropertyListRows.columns)[:limit]),
+            ),
+            (
+                'owner property list',
+                lambda: OwnerPropertyListSerializer(list(properties[:limit]), many=True).data,
+                lambda: OwnerPropertyListRows().serialize(properties.values_list(*OwnerPropertyListRows.columns)[:limit]),
+            ),
+            (
+                'favorites',
+                lambda: PropertyFavoriteSerializer(list(favorites[:limit]), many=True).data,
+                lambda: PropertyFavoriteRows().serialize(favorites.values_list(*PropertyFavoriteRows.columns)[:limit]),
+            ),
+        ]
+        encoder = 'orjson' if renderers.orjson is not None else 'stdlib json (orjson not installed)'
+        self.stdout.write(f'FastJSONRenderer encoder: {encoder}')
+
+        for label, serializer_path, rows_path in cases:
+            expected = JSONRenderer().render(serializer_path())
+            actual = FastJSONRenderer().render(rows_path())
+            count = len(serializer_path())
+            if not count:
+                self.stdout.write(f'{label}: no rows, skipped')
+                continue
+            if expected != actual:
+                raise CommandError(f'{label}: value rows differ from the serializer output')
+
+            for path_label, build, renderer in (
+                ('serializer + JSONRenderer', serializer_path, JSONRenderer()),
+                ('rows + FastJSONRenderer', rows_path, FastJSONRenderer()),
+            ):
+                best = None
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    renderer.render(build())
+                    elapsed = time.perf_counter() - started
+                    best = elapsed if best is None else min(best, elapsed)
+                self.stdout.write(f'{label} ({count} rows), {path_label}: {count / best:,.0f} rows/s')
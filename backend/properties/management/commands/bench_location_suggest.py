@@ -0,0 +1,87 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory
+
+from properties.locations import LocationIndex, location_index
+from properties.views import suggest_locations
+
+STREETS = ['Oak', 'Maple', 'Cedar', 'Lake', 'Hill', 'Park', 'River', 'Sunset', 'Mill', 'Church', 'Station', 'Bay']
+KINDS = ['Street', 'Avenue', 'Road', 'Lane', 'Drive', 'Court']
+SYLLABLES = ['ban', 'gal', 'mum', 'pu', 'ne', 'kol', 'ka', 'ta', 'ch', 'en', 'nai', 'hy', 'der', 'ab', 'ad', 'go', 'a', 'del', 'hi', 'sur', 'at']
+
+
+def synthetic_locations(count, seed):
+    """``count`` distinct location strings with Zipf-like listing counts."""
+    rng = random.Random(seed)
+    cities = set()
+    while len(cities) < max(count // 40, 10):
+        cities.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title())
+    cities = sorted(cities)
+    locations = {}
+    while len(locations) < count:
+        location = f'{rng.randint(1, 999)} {rng.choice(STREETS)} {rng.choice(KINDS)}, {rng.choice(cities)}'
+        locations[location] = max(1, int(1000 / rng.randint(1, 1000)))
+    return list(locations.items())
+
+
+def percentiles(timings):
+    timings = sorted(timings)
+    return statistics.median(timings), timings[int(len(timings) * 0.99)], timings[-1]
+
+
+class Command(BaseCommand):
+    help = 'Measure location typeahead build, query and incremental update cost on synthetic locations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--locations', type=int, default=100000)
+        parser.add_argument('--queries', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rows = synthetic_locations(options['locations'], options['seed'])
+        rng = random.Random(options['seed'])
+        index = LocationIndex()
+
+        started = time.perf_counter()
+        index.load(rows)
+        self.stdout.write(f'build: {len(rows)} distinct locations in {(time.perf_counter() - started) * 1000:.0f} ms')
+
+        # Prefixes as typed, one keystroke at a time, from real locations
+        prefixes = []
+        for _ in range(options['queries']):
+            location = rng.choice(rows)[0]
+            prefixes.append(location[:rng.randint(1, 12)])
+
+        for label, wanted in (('1-2 chars', range(1, 3)), ('3-5 chars', range(3, 6)), ('6+ chars', range(6, 13))):
+            timings = []
+            for prefix in prefixes:
+                if len(prefix) in wanted:
+                    started = time.perf_counter()
+                    index.suggest(prefix)
+                    timings.append((time.perf_counter() - started) * 1e6)
+            p50, p99, worst = percentiles(timings)
+            self.stdout.write(f'suggest ({label}): p50={p50:.1f} us p99={p99:.1f} us max={worst:.0f} us')
+
+        timings = []
+        for _ in range(2000):
+            old, new = rng.choice(rows)[0], rng.choice(rows)[0]
+            started = time.perf_counter()
+            index.move(old, new)
+            timings.append((time.perf_counter() - started) * 1e6)
+        p50, p99, worst = percentiles(timings)
+        self.stdout.write(f'move: p50={p50:.1f} us p99={p99:.1f} us max={worst:.0f} us')
+
+        # Same index behind the endpoint, including DRF request handling
+        location_index.load(rows)
+        factory = APIRequestFactory()
+        timings = []
+        for prefix in prefixes[:2000]:
+            request = factory.get('/api/properties/locations/suggest/', {'q': prefix})
+            started = time.perf_counter()
+            suggest_locations(request).render()
+            timings.append((time.perf_counter() - started) * 1000)
+        p50, p99, _ = percentiles(timings)
+        self.stdout.write(f'endpoint: p50={p50:.3f} ms p99={p99:.3f} ms')
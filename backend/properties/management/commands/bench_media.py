@@ -0,0 +1,57 @@
+import os
+import time
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.views.static import serve
+from PIL import Image
+
+from properties.media import HashedMediaStorage, serve_media, variant_name
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the media endpoint against django.views.static.serve'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        storage = HashedMediaStorage()
+
+        buffer = BytesIO()
+        Image.new('RGB', (800, 600), (120, 80, 40)).save(buffer, format='JPEG', quality=85)
+        name = storage.save('properties/bench.jpg', ContentFile(buffer.getvalue()))
+        buffer = BytesIO()
+        Image.new('RGB', (320, 240), (120, 80, 40)).save(buffer, format='JPEG', quality=85)
+        small = storage.save_variant(name, 320, ContentFile(buffer.getvalue()))
+
+        factory = RequestFactory()
+        etag = f'"{os.path.basename(name)}"'
+        scenarios = [
+            ('static.serve, full body', lambda: serve(factory.get('/'), name, document_root=settings.MEDIA_ROOT)),
+            ('serve_media, full body', lambda: serve_media(factory.get('/'), name)),
+            ('serve_media, 320w variant', lambda: serve_media(factory.get('/'), variant_name(name, 320))),
+            ('serve_media, If-None-Match', lambda: serve_media(factory.get('/', HTTP_IF_NONE_MATCH=etag), name)),
+            ('serve_media, Range 0-1023', lambda: serve_media(factory.get('/', HTTP_RANGE='bytes=0-1023'), name)),
+        ]
+
+        try:
+            for label, call in scenarios:
+                transferred = 0
+                started = time.perf_counter()
+                for _ in range(count):
+                    response = call()
+                    transferred += sum(len(chunk) for chunk in response) if response.streaming else len(response.content)
+                    response.close()
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f'{label:32} {elapsed / count * 1000:8.3f} ms/req '
+                    f'{transferred / count / 1024:8.1f} KiB/req status={response.status_code}'
+                )
+        finally:
+            storage.delete(name)
+            storage.delete(small)
@@ -0,0 +1,73 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+
+from properties import events
+from properties.models import EventConsumer, Property, PropertyEvent
+
+
+class Command(BaseCommand):
+    help = 'Benchmark outbox producer overhead and consumer throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000)
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        owner, _ = get_user_model().objects.get_or_create(
+            email='outbox-bench@example.com',
+            defaults={'username': 'outbox-bench', 'first_name': 'Outbox', 'last_name': 'Bench'},
+        )
+        start_id = PropertyEvent.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+        # Sequence everything already written so the consumer starts after it
+        events.assign_sequences(limit=None)
+        start_sequence = events.position(EventConsumer.SEQUENCER)
+
+        def build(i):
+            return Property(title=f'Bench {i}', price=i, location='Bench', area=100, owner=owner)
+
+        consumer = 'outbox-bench'
+        try:
+            # Baseline: the plain INSERT, skipping Property.save and its outbox write
+            started = time.perf_counter()
+            for i in range(rows):
+                with transaction.atomic():
+                    models.Model.save(build(i))
+            baseline = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for i in range(rows):
+                build(i).save()
+            with_outbox = time.perf_counter() - started
+
+            self.stdout.write(
+                f'producer: plain insert {rows / baseline:,.0f} rows/s, '
+                f'insert + event {rows / with_outbox:,.0f} rows/s '
+                f'({(with_outbox - baseline) / rows * 1e6:.0f} us/event overhead)'
+            )
+
+            events.seek(consumer, start_sequence)
+            consumed = 0
+            started = time.perf_counter()
+            while True:
+                batch = events.claim(consumer, limit=options['batch_size'])
+                if not batch:
+                    break
+                consumed += len(batch)
+                events.acknowledge(consumer, batch[-1].sequence, batch.lease)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'consumer: {consumed} events in {elapsed * 1000:.0f} ms '
+                f'({consumed / elapsed:,.0f} events/s, batch {options["batch_size"]})'
+            )
+        finally:
+            owner.properties.all().delete()
+            # Only the bench listings' events; other writers may have added their own meanwhile
+            PropertyEvent.objects.filter(
+                pk__gt=start_id, event_type__startswith='property.', payload__owner_id=owner.pk
+            ).delete()
+            owner.delete()
+            EventConsumer.objects.filter(name=consumer).delete()
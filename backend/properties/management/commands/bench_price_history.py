@@ -0,0 +1,85 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from properties.models import Property, PropertyPriceChange
+from properties.views import price_drops, price_history
+
+
+class Command(BaseCommand):
+    help = 'Benchmark price-history write overhead and price-drop feed latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help='History rows to generate')
+        parser.add_argument('--properties', type=int, default=1000)
+        parser.add_argument('--updates', type=int, default=500)
+
+    def handle(self, *args, **options):
+        owner, _ = get_user_model().objects.get_or_create(
+            email='price-bench@example.com',
+            defaults={'username': 'price-bench', 'first_name': 'Price', 'last_name': 'Bench'},
+        )
+        try:
+            self.run(owner, options)
+        finally:
+            owner.properties.all().delete()
+            owner.delete()
+
+    def run(self, owner, options):
+        properties = Property.objects.bulk_create([
+            Property(title=f'Price bench {i}', price=100000, location='Bench', area=100, owner=owner)
+            for i in range(options['properties'])
+        ])
+        ids = [prop.pk for prop in properties]
+
+        started = time.perf_counter()
+        rng = random.Random(0)
+        now = timezone.now()
+        batch = []
+        for i in range(options['rows']):
+            price = Decimal(rng.randrange(50000, 150000))
+            batch.append(PropertyPriceChange(
+                property_id=ids[i % len(ids)], price=price, previous_price=price + rng.randrange(-500, 500),
+                is_drop=rng.random() < 0.3, changed_at=now - timedelta(minutes=options['rows'] - i),
+            ))
+            if len(batch) == 10000:
+                PropertyPriceChange.objects.bulk_create(batch)
+                batch = []
+        PropertyPriceChange.objects.bulk_create(batch)
+        self.stdout.write(f'generated {options["rows"]:,} history rows in {time.perf_counter() - started:.1f} s')
+
+        # Write overhead: saves that change the price versus saves that do not
+        subjects = list(Property.objects.filter(pk__in=ids[:options['updates']]))
+        started = time.perf_counter()
+        for prop in subjects:
+            prop.title = prop.title + '.'
+            prop.save()
+        unchanged = (time.perf_counter() - started) / len(subjects) * 1000
+        started = time.perf_counter()
+        for prop in subjects:
+            prop.price = prop.price - 1
+            prop.save()
+        changed = (time.perf_counter() - started) / len(subjects) * 1000
+        self.stdout.write(
+            f'save without price change {unchanged:.3f} ms, with price change {changed:.3f} ms '
+            f'(+{changed - unchanged:.3f} ms)'
+        )
+
+        factory = APIRequestFactory()
+        for label, call in (
+            ('price-drops feed (limit 20)', lambda: price_drops(factory.get('/', {'limit': 20}))),
+            ('price-history (100 points)', lambda: price_history(factory.get('/', {'points': 100}), property_id=ids[0])),
+        ):
+            timings = []
+            for _ in range(50):
+                started = time.perf_counter()
+                call().render()
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(f'{label}: p50={statistics.median(timings):.2f} ms max={max(timings):.2f} ms')
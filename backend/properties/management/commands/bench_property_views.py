@@ -0,0 +1,64 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory
+
+from properties.models import Property
+from properties.tracking import view_tracker
+from properties.views import PropertyDetailView
+
+
+class Command(BaseCommand):
+    help = 'Load-test PropertyDetailView with view tracking off and on'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--properties', type=int, default=200)
+
+    def handle(self, *args, **options):
+        owner, _ = get_user_model().objects.get_or_create(
+            email='views-bench@example.com',
+            defaults={'username': 'views-bench', 'first_name': 'Views', 'last_name': 'Bench'},
+        )
+        properties = Property.objects.bulk_create([
+            Property(title=f'Views bench {i}', price=100, location='Bench', area=100, owner=owner)
+            for i in range(options['properties'])
+        ])
+        ids = [prop.pk for prop in properties]
+        factory = APIRequestFactory()
+        view = PropertyDetailView.as_view()
+
+        def run(count):
+            timings = []
+            for i in range(count):
+                # Rotate viewers so roughly half the requests are de-duplicated
+                # repeats; they arrive through the proxy, as in production
+                request = factory.get('/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'10.1.{i % 50}.{i % 7}')
+                started = time.perf_counter()
+                response = view(request, pk=ids[i % len(ids)])
+                response.render()
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            return statistics.median(timings), timings[int(len(timings) * 0.95)]
+
+        try:
+            count = options['requests']
+            run(min(count, 200))  # warm up
+            with override_settings(PROPERTY_VIEWS_ENABLED=False):
+                off = run(count)
+            with override_settings(PROPERTY_VIEWS_ENABLED=True):
+                on = run(count)
+            self.stdout.write(f'tracking off: p50={off[0]:.3f} ms p95={off[1]:.3f} ms')
+            self.stdout.write(f'tracking on:  p50={on[0]:.3f} ms p95={on[1]:.3f} ms')
+
+            started = time.perf_counter()
+            written = view_tracker.flush()
+            self.stdout.write(
+                f'flush: {written} properties in {(time.perf_counter() - started) * 1000:.1f} ms'
+            )
+        finally:
+            owner.properties.all().delete()
+            owner.delete()
@@ -0,0 +1,53 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory
+
+from backend.throttling import CostWeightedThrottle, get_store
+from properties.views import PropertyListCreateView
+
+
+class Command(BaseCommand):
+    help = 'Measure the per-request overhead of CostWeightedThrottle'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        factory = APIRequestFactory()
+        store = type(get_store()).__name__
+        budgets = {
+            'anon': {'default': f'{count * 100}/min'},
+            'user': {'default': f'{count * 100}/min'},
+        }
+
+        with override_settings(THROTTLE_BUDGETS=budgets):
+            throttle = CostWeightedThrottle()
+            view = PropertyListCreateView()
+            for label, path in (('plain', '/api/properties/'), ('search + page 40', '/api/properties/?search=goa&page=40')):
+                timings = []
+                for i in range(count):
+                    request = PropertyListCreateView().initialize_request(
+                        factory.get(path, REMOTE_ADDR=f'10.1.{i % 200}.{i % 250}')
+                    )
+                    started = time.perf_counter()
+                    throttle.allow_request(request, view)
+                    timings.append((time.perf_counter() - started) * 1e6)
+                timings.sort()
+                self.stdout.write(
+                    f'{store} allow_request ({label}): p50={statistics.median(timings):.1f} us '
+                    f'p99={timings[int(len(timings) * 0.99)]:.1f} us'
+                )
+
+            for label, classes in (('without throttle', []), ('with throttle', [CostWeightedThrottle])):
+                listing = PropertyListCreateView.as_view(throttle_classes=classes)
+                timings = []
+                for i in range(min(count, 1000)):
+                    request = factory.get('/api/properties/', REMOTE_ADDR=f'10.2.{i % 200}.1')
+                    started = time.perf_counter()
+                    listing(request).render()
+                    timings.append((time.perf_counter() - started) * 1000)
+                self.stdout.write(f'listing {label}: p50={statistics.median(timings):.3f} ms')
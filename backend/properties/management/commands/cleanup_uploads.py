@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from properties.uploads import cleanup_uploads
+
+
+class Command(BaseCommand):
+    help = 'Delete stale chunked upload sessions and image blobs no property references'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age-hours', type=int, default=None,
+                            help='Defaults to settings.UPLOAD_SESSION_MAX_AGE_HOURS')
+
+    def handle(self, *args, **options):
+        sessions, blobs = cleanup_uploads(options['max_age_hours'])
+        self.stdout.write(self.style.SUCCESS(f'Removed {sessions} upload sessions and {blobs} unused images'))
@@ -0,0 +1,77 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from properties.duplicates import SIGNATURE_COLUMNS, cluster_signatures, index_properties, stored_signature
+from properties.models import Property, PropertySignature
+
+
+class Command(BaseCommand):
+    help = (
+        'Index properties that have no duplicate signature yet (all of them with --reindex), '
+        'then group the whole table into near-duplicate clusters and store each cluster id'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reindex', action='store_true', help='Recompute every signature')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--threshold', type=float, default=None,
+                            help='Defaults to settings.PROPERTY_DUPLICATE_THRESHOLD')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        started = time.perf_counter()
+        properties = Property.objects.only(
+            'pk', 'title', 'description', 'location', 'price', 'area', 'property_type', 'bedrooms', 'bathrooms',
+            'is_sold',
+        ).order_by('pk')
+        if not options['reindex']:
+            properties = properties.filter(signature__isnull=True)
+        indexed = 0
+        last_pk = 0
+        while True:
+            batch = list(properties.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            index_properties(batch)
+            indexed += len(batch)
+            last_pk = batch[-1].pk
+        elapsed = time.perf_counter() - started
+        rate = f' ({indexed / elapsed:,.0f}/s)' if indexed else ''
+        self.stdout.write(f'Indexed {indexed} properties in {elapsed:.1f} s{rate}')
+
+        started = time.perf_counter()
+        ids, signatures, current = [], [], {}
+        rows = PropertySignature.objects.order_by().values_list('property_id', 'cluster_id', *SIGNATURE_COLUMNS)
+        for property_id, cluster_id, *signature in rows.iterator(chunk_size=batch_size):
+            ids.append(property_id)
+            signatures.append(stored_signature(signature))
+            if cluster_id is not None:
+                current[property_id] = cluster_id
+        roots = cluster_signatures(signatures, options['threshold'])
+
+        members = {}
+        for property_id, root in zip(ids, roots):
+            members.setdefault(root, []).append(property_id)
+        cluster_ids = {}
+        for group in members.values():
+            if len(group) > 1:
+                cluster_id = min(group)
+                cluster_ids.update((property_id, cluster_id) for property_id in group)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'Clustered {len(ids)} signatures in {elapsed:.1f} s ({len(ids) / max(elapsed, 1e-9):,.0f}/s)')
+
+        changed = [
+            PropertySignature(property_id=property_id, cluster_id=cluster_ids.get(property_id))
+            for property_id in set(cluster_ids) | set(current)
+            if cluster_ids.get(property_id) != current.get(property_id)
+        ]
+        with transaction.atomic():
+            PropertySignature.objects.bulk_update(changed, ['cluster_id'], batch_size=500)
+
+        clusters = len(set(cluster_ids.values()))
+        self.stdout.write(self.style.SUCCESS(
+            f'{clusters} duplicate clusters covering {len(cluster_ids)} properties; {len(changed)} cluster ids updated'
+        ))
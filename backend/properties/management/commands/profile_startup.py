@@ -0,0 +1,131 @@
+import json
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+ENTRYPOINTS = {
+    'wsgi': [sys.executable, '-X', 'importtime', '-c', 'import backend.wsgi'],
+    'asgi': [sys.executable, '-X', 'importtime', '-c', 'import backend.asgi'],
+    'manage': [sys.executable, '-X', 'importtime', 'manage.py', 'version'],
+}
+
+# Runs django.setup() with each app's config import, models import and
+# ready() timed separately, and prints the timings as JSON
+APP_READY_PROBE = '''
+import json, os, sys, time
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+from django.apps import config
+
+timings = {}
+original_create = config.AppConfig.create.__func__
+original_import_models = config.AppConfig.import_models
+
+def timed(label, phase, func):
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings.setdefault(label, {})[phase] = (time.perf_counter() - started) * 1000
+    return wrapper
+
+def create(cls, entry):
+    started = time.perf_counter()
+    app_config = original_create(cls, entry)
+    timings.setdefault(app_config.label, {})["config"] = (time.perf_counter() - started) * 1000
+    app_config.ready = timed(app_config.label, "ready", app_config.ready)
+    return app_config
+
+def import_models(self):
+    timed(self.label, "models", original_import_models)(self)
+
+config.AppConfig.create = classmethod(create)
+config.AppConfig.import_models = import_models
+
+import django
+django.setup()
+sys.stdout.write(json.dumps(timings))
+'''
+
+
+def parse_importtime(stderr):
+    """Return {module: (self_us, cumulative_us)} from ``python -X importtime`` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+class Command(BaseCommand):
+    help = (
+        'Report cold-start cost of the wsgi, asgi and manage.py entrypoints: wall time, '
+        'import time per package and per-app setup time. Fails when an entrypoint '
+        'exceeds settings.STARTUP_BUDGET_MS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--top', type=int, default=15)
+        parser.add_argument('--budget', type=int, default=None,
+                            help='Milliseconds; defaults to settings.STARTUP_BUDGET_MS')
+
+    def handle(self, *args, **options):
+        budget = options['budget'] or settings.STARTUP_BUDGET_MS
+        cwd = settings.BASE_DIR
+        over_budget = []
+
+        for name, command in ENTRYPOINTS.items():
+            walls = []
+            imports = None
+            for _ in range(options['runs']):
+                started = time.perf_counter()
+                result = subprocess.run(command, cwd=cwd, capture_output=True, text=True)
+                walls.append((time.perf_counter() - started) * 1000)
+                if result.returncode != 0:
+                    raise CommandError(f'{name} failed to start:\n{result.stderr[-2000:]}')
+                imports = parse_importtime(result.stderr)
+            wall = statistics.median(walls)
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{name}: median {wall:.0f} ms over {len(walls)} runs (budget {budget} ms)'
+            ))
+            if wall > budget:
+                over_budget.append(name)
+            if name == 'wsgi':
+                self.report_imports(imports, options['top'])
+
+        self.report_apps(cwd)
+
+        if over_budget:
+            raise CommandError(f'Startup over budget ({budget} ms): {", ".join(over_budget)}')
+        self.stdout.write(self.style.SUCCESS('All entrypoints within budget'))
+
+    def report_imports(self, modules, top):
+        packages = defaultdict(int)
+        for module, (self_us, _) in modules.items():
+            packages[module.split('.')[0]] += self_us
+        self.stdout.write('  import time by top-level package (self, ms):')
+        for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+            self.stdout.write(f'    {self_us / 1000:8.1f}  {package}')
+        self.stdout.write('  slowest modules (cumulative, ms):')
+        for module, (_, cumulative_us) in sorted(modules.items(), key=lambda item: -item[1][1])[:top]:
+            self.stdout.write(f'    {cumulative_us / 1000:8.1f}  {module}')
+
+    def report_apps(self, cwd):
+        result = subprocess.run([sys.executable, '-c', APP_READY_PROBE], cwd=cwd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise CommandError(f'App setup probe failed:\n{result.stderr[-2000:]}')
+        timings = json.loads(result.stdout)
+        self.stdout.write(self.style.MIGRATE_HEADING('App setup (ms): config / models / ready'))
+        for label, phases in sorted(timings.items(), key=lambda item: -sum(item[1].values())):
+            self.stdout.write(
+                f'    {phases.get("config", 0):7.1f} {phases.get("models", 0):7.1f} '
+                f'{phases.get("ready", 0):7.1f}  {label}'
+            )
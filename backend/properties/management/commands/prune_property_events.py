@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from properties.events import prune
+
+
+class Command(BaseCommand):
+    help = 'Delete outbox events older than the retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-days', type=int, default=None,
+                            help='Defaults to settings.PROPERTY_EVENTS_RETENTION_DAYS')
+
+    def handle(self, *args, **options):
+        removed = prune(options['retention_days'])
+        self.stdout.write(self.style.SUCCESS(f'Pruned {removed} events'))
@@ -0,0 +1,268 @@
+import hashlib
+import mimetypes
+import os
+import re
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.deconstruct import deconstructible
+from django.utils.http import http_date
+
+# Pillow is imported inside the functions that need it: it costs ~15 ms and
+# this module is loaded by properties.models on every process start.
+
+# Hashed names look like "properties/3f2a9c0d1e4b5a6f7081.jpg" or, for
+# responsive variants, "properties/3f2a9c0d1e4b5a6f7081_320w.jpg".
+HASH_LENGTH = 20
+HASHED_NAME_RE = re.compile(r'(?:^|/)(?P<digest>[0-9a-f]{%d})(?:_\d+w)?\.[^/.]+$' % HASH_LENGTH)
+RANGE_RE = re.compile(r'^bytes=(?P<start>\d*)-(?P<end>\d*)$')
+
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+MUTABLE_MAX_AGE = 60 * 60
+MAX_IMAGE_SIZE = (800, 800)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+def verify_image(fileobj):
+    """Raise InvalidImage unless Pillow recognises ``fileobj`` as an intact image."""
+    from PIL import Image
+
+    fileobj.seek(0)
+    try:
+        with Image.open(fileobj) as img:
+            img.verify()
+    except (OSError, SyntaxError, Image.DecompressionBombError) as e:
+        raise InvalidImage(f'Not a valid image: {e}') from e
+    finally:
+        fileobj.seek(0)
+
+
+def file_digest(content):
+    hasher = hashlib.sha256()
+    for chunk in content.chunks(STREAM_CHUNK_SIZE):
+        hasher.update(chunk)
+    content.seek(0)
+    return hasher.hexdigest()
+
+
+def hashed_name(name, digest):
+    directory, filename = os.path.split(name)
+    extension = os.path.splitext(filename)[1].lower()
+    return os.path.join(directory, f'{digest[:HASH_LENGTH]}{extension}')
+
+
+def variant_name(name, width):
+    root, extension = os.path.splitext(name)
+    return f'{root}_{width}w{extension}'
+
+
+def is_hashed(name):
+    return HASHED_NAME_RE.search(name) is not None
+
+
+@deconstructible
+class HashedMediaStorage(FileSystemStorage):
+    """
+    Stores files under a name derived from their content hash, so a stored
+    file never changes and identical uploads share one file on disk.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = ContentFile(content.read(), name=name)
+        name = hashed_name(name, file_digest(content))
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    def save_variant(self, name, width, content):
+        # Variant names derive from the already-hashed original.
+        name = variant_name(name, width)
+        if self.exists(name):
+            return name
+        return super().save(name, content)
+
+
+def store_image(storage, name, fileobj):
+    """
+    Shrink an image to MAX_IMAGE_SIZE, store it under its content hash and
+    write the responsive variants. Returns the stored name and every
+    available width, smallest first, with the stored image's own width last.
+    Images that need no resizing are streamed to storage as they are.
+    Raises InvalidImage, storing nothing, if Pillow cannot decode the file.
+    """
+    from PIL import Image
+
+    fileobj.seek(0)
+    try:
+        with Image.open(fileobj) as img:
+            img.load()
+            image_format = img.format
+            resized = img.height > MAX_IMAGE_SIZE[1] or img.width > MAX_IMAGE_SIZE[0]
+            if resized:
+                img.thumbnail(MAX_IMAGE_SIZE, Image.Resampling.LANCZOS)
+            original = img.copy()
+    except (OSError, SyntaxError, Image.DecompressionBombError) as e:
+        raise InvalidImage(f'Not a valid image: {e}') from e
+
+    if resized:
+        content = ContentFile(_encode(original, image_format))
+    else:
+        fileobj.seek(0)
+        content = File(fileobj, name=name)
+    stored = storage.save(name, content)
+    widths = generate_variants(storage, stored, original, image_format)
+    return stored, widths + [original.width]
+
+
+def delete_image_files(storage, name, widths):
+    storage.delete(name)
+    for width in widths[:-1]:
+        storage.delete(variant_name(name, width))
+
+
+def generate_variants(storage, name, img, image_format):
+    from PIL import Image
+
+    widths = []
+    for width in sorted(settings.MEDIA_IMAGE_WIDTHS):
+        if width >= img.width:
+            continue
+        variant = img.copy()
+        variant.thumbnail((width, img.height), Image.Resampling.LANCZOS)
+        storage.save_variant(name, width, ContentFile(_encode(variant, image_format)))
+        widths.append(width)
+    return widths
+
+
+def _encode(img, image_format):
+    buffer = BytesIO()
+    img.save(buffer, format=image_format, optimize=True, quality=85)
+    return buffer.getvalue()
+
+
+def build_srcset(field_file, widths, request=None):
+    if not field_file or not widths:
+        return None
+    url = field_file.url
+    candidates = [(variant_name(url, width), width) for width in widths[:-1]]
+    candidates.append((url, widths[-1]))
+    if request is not None:
+        candidates = [(request.build_absolute_uri(url), width) for url, width in candidates]
+    return ', '.join(f'{url} {width}w' for url, width in candidates)
+
+
+def _parse_range(header, size):
+    """
+    Return (start, end) for a single satisfiable byte range, None to serve the
+    full body, or False when the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or (not match['start'] and not match['end']):
+        return None
+    if match['start']:
+        start = int(match['start'])
+        end = int(match['end']) if match['end'] else size - 1
+    else:
+        start = max(size - int(match['end']), 0)
+        end = size - 1
+    if start >= size or start > end:
+        return False
+    return start, min(end, size - 1)
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        while length > 0:
+            chunk = handle.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_media(request, path):
+    """
+    Production media endpoint: immutable caching for hashed names,
+    conditional and Range requests, and optional hand-off of the transfer to
+    the front server through X-Accel-Redirect or X-Sendfile.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponse(status=405, headers={'Allow': 'GET, HEAD'})
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('Invalid media path')
+    if not os.path.isfile(fullpath):
+        raise Http404('Media file not found')
+
+    stat = os.stat(fullpath)
+    if is_hashed(path):
+        etag = f'"{os.path.basename(path)}"'
+        cache_control = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        etag = f'"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+        cache_control = f'public, max-age={MUTABLE_MAX_AGE}'
+
+    content_type = mimetypes.guess_type(fullpath)[0] or 'application/octet-stream'
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': cache_control,
+        'Accept-Ranges': 'bytes',
+    }
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if not_modified is not None:
+        for header, value in headers.items():
+            not_modified.headers[header] = value
+        return not_modified
+
+    backend = getattr(settings, 'MEDIA_SERVE_BACKEND', None)
+    if backend == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type, headers=headers)
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + path
+        return response
+    if backend == 'x-sendfile':
+        response = HttpResponse(content_type=content_type, headers=headers)
+        response['X-Sendfile'] = fullpath
+        return response
+
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if range_header:
+        if_range = request.headers.get('If-Range')
+        if not if_range or if_range == etag:
+            byte_range = _parse_range(range_header, stat.st_size)
+
+    if byte_range is False:
+        headers['Content-Range'] = f'bytes */{stat.st_size}'
+        return HttpResponse(status=416, headers=headers)
+
+    if byte_range is None:
+        return FileResponse(open(fullpath, 'rb'), content_type=content_type, headers=headers)
+
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(
+        _read_range(fullpath, start, length) if request.method == 'GET' else iter(()),
+        status=206,
+        content_type=content_type,
+        headers=headers,
+    )
+    response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    response['Content-Length'] = str(length)
+    return response
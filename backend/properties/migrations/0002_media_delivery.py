@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:01
+
+import properties.media
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='image_widths',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=properties.media.HashedMediaStorage(), upload_to='properties/'),
+        ),
+    ]
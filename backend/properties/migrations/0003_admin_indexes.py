@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0002_media_delivery'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['-created_at'], name='property_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['title'], name='property_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['location'], name='property_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertyfavorite',
+            index=models.Index(fields=['-created_at'], name='favorite_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertypurchase',
+            index=models.Index(fields=['-purchase_date'], name='purchase_date_idx'),
+        ),
+    ]
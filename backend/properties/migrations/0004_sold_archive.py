@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:03
+
+import django.db.models.deletion
+import properties.media
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0003_admin_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='propertypurchase',
+            name='property',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='purchases', to='properties.property'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedProperty',
+            fields=[
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('location', models.CharField(max_length=200)),
+                ('property_type', models.CharField(choices=[('house', 'House'), ('apartment', 'Apartment'), ('condo', 'Condo'), ('commercial', 'Commercial')], default='house', max_length=20)),
+                ('bedrooms', models.PositiveIntegerField(default=0)),
+                ('bathrooms', models.DecimalField(decimal_places=1, default=0, max_digits=3)),
+                ('area', models.PositiveIntegerField(help_text='Area in square feet')),
+                ('image', models.ImageField(blank=True, null=True, storage=properties.media.HashedMediaStorage(), upload_to='properties/')),
+                ('image_widths', models.JSONField(blank=True, default=list, editable=False)),
+                ('is_sold', models.BooleanField(default=False)),
+                ('is_featured', models.BooleanField(default=False)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_properties', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Archived properties',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='propertypurchase',
+            name='archived_property',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='purchases', to='properties.archivedproperty'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedPropertyFavorite',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='favorited_by', to='properties.archivedproperty')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_favorites', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:13
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def seed_listing_prices(apps, schema_editor):
+    # Start every existing property's history at its current price
+    Property = apps.get_model('properties', 'Property')
+    PropertyPriceChange = apps.get_model('properties', 'PropertyPriceChange')
+    batch = []
+    for pk, price, created_at in Property.objects.values_list('pk', 'price', 'created_at').iterator():
+        batch.append(PropertyPriceChange(property_id=pk, price=price, changed_at=created_at))
+        if len(batch) >= 1000:
+            PropertyPriceChange.objects.bulk_create(batch)
+            batch = []
+    PropertyPriceChange.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0006_view_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyPriceChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('previous_price', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('is_drop', models.BooleanField(default=False)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_history', to='properties.property')),
+            ],
+            options={
+                'ordering': ['changed_at'],
+                'indexes': [models.Index(fields=['property', 'changed_at'], name='price_history_idx'), models.Index(fields=['is_drop', '-changed_at'], name='price_drop_recent_idx')],
+            },
+        ),
+        migrations.RunPython(seed_listing_prices, migrations.RunPython.noop),
+    ]
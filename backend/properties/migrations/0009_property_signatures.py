@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0008_image_blobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertySignature',
+            fields=[
+                ('property', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='properties.property')),
+                ('minhash', models.BinaryField()),
+                ('price_bucket', models.IntegerField()),
+                ('area_bucket', models.IntegerField()),
+                ('cluster_id', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PropertySignatureBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField()),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='properties.property')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bucket', 'property'], name='signature_band_idx')],
+            },
+        ),
+    ]
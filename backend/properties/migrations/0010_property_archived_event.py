@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0009_property_signatures'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='propertyevent',
+            name='event_type',
+            field=models.CharField(choices=[('property.created', 'Property created'), ('property.updated', 'Property updated'), ('property.sold', 'Property sold'), ('property.deleted', 'Property deleted'), ('property.archived', 'Property archived'), ('purchase.created', 'Purchase created'), ('purchase.updated', 'Purchase updated'), ('favorite.added', 'Favorite added'), ('favorite.removed', 'Favorite removed')], max_length=40),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0010_property_archived_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedproperty',
+            name='views',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
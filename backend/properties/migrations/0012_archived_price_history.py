@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0011_archived_property_views'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='propertypricechange',
+            name='archived_property',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='price_history', to='properties.archivedproperty'),
+        ),
+        migrations.AlterField(
+            model_name='propertypricechange',
+            name='property',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='price_history', to='properties.property'),
+        ),
+        migrations.AddIndex(
+            model_name='propertypricechange',
+            index=models.Index(fields=['archived_property', 'changed_at'], name='archived_price_history_idx'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:53
+
+import re
+
+from django.db import migrations, models
+
+# Copied from properties.duplicates as it stood when this migration was
+# written, so later changes there do not change what the migration does
+MIN_SHINGLES = 8
+SHINGLE_SIZE = 3
+TOKEN_RE = re.compile(r'\w+')
+
+
+def shingle_count(title, description, location):
+    tokens = TOKEN_RE.findall(f'{title} {description} {location}'.casefold())
+    return len({' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(max(len(tokens) - SHINGLE_SIZE + 1, 1))})
+
+
+def fill_match_fields(apps, schema_editor):
+    # Copy the exact-match fields, count the shingles of the listing text,
+    # and drop the band keys of listings that are sold or too short to match
+    Property = apps.get_model('properties', 'Property')
+    PropertySignature = apps.get_model('properties', 'PropertySignature')
+    PropertySignatureBand = apps.get_model('properties', 'PropertySignatureBand')
+    rows = Property.objects.filter(signature__isnull=False).values_list(
+        'pk', 'title', 'description', 'location', 'property_type', 'bedrooms', 'bathrooms', 'is_sold'
+    )
+    batch, unbanded = [], []
+    for pk, title, description, location, property_type, bedrooms, bathrooms, is_sold in rows.iterator():
+        count = shingle_count(title, description, location)
+        batch.append(PropertySignature(
+            property_id=pk, shingle_count=count, property_type=property_type,
+            bedrooms=bedrooms, bathrooms=bathrooms,
+        ))
+        if is_sold or count < MIN_SHINGLES:
+            unbanded.append(pk)
+        if len(batch) >= 1000:
+            PropertySignature.objects.bulk_update(batch, ['shingle_count', 'property_type', 'bedrooms', 'bathrooms'])
+            PropertySignatureBand.objects.filter(property_id__in=unbanded).delete()
+            batch, unbanded = [], []
+    PropertySignature.objects.bulk_update(batch, ['shingle_count', 'property_type', 'bedrooms', 'bathrooms'])
+    PropertySignatureBand.objects.filter(property_id__in=unbanded).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0012_archived_price_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='propertysignature',
+            name='bathrooms',
+            field=models.DecimalField(decimal_places=1, default=0, max_digits=3),
+        ),
+        migrations.AddField(
+            model_name='propertysignature',
+            name='bedrooms',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='propertysignature',
+            name='property_type',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='propertysignature',
+            name='shingle_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_match_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:01
+
+from django.db import migrations, models
+from django.db.models import F, Max
+
+
+def sequence_existing_events(apps, schema_editor):
+    # Existing events keep their id as their sequence, so consumer positions
+    # stay valid; new sequences continue after the highest id
+    PropertyEvent = apps.get_model('properties', 'PropertyEvent')
+    EventConsumer = apps.get_model('properties', 'EventConsumer')
+    PropertyEvent.objects.update(sequence=F('pk'))
+    last = PropertyEvent.objects.aggregate(last=Max('pk'))['last'] or 0
+    EventConsumer.objects.update_or_create(name='__sequencer__', defaults={'position': last})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0013_signature_match_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventconsumer',
+            name='lease_token',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='propertyevent',
+            name='sequence',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, unique=True),
+        ),
+        migrations.RunPython(sequence_existing_events, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:05
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0014_commit_time_event_sequence'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='property',
+            name='property_title_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='property',
+            name='property_location_idx',
+        ),
+        migrations.AddIndex(
+            model_name='archivedproperty',
+            index=models.Index(fields=['archived_at'], name='archived_property_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedproperty',
+            index=models.Index(django.db.models.functions.text.Lower('title'), name='archived_title_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedproperty',
+            index=models.Index(django.db.models.functions.text.Lower('location'), name='archived_location_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(django.db.models.functions.text.Lower('title'), name='property_title_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(django.db.models.functions.text.Lower('location'), name='property_location_lower_idx'),
+        ),
+    ]
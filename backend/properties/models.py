@@ -1,9 +1,77 @@
-from django.db import models
-from django.conf import settings
-from PIL import Image
 import os
+import uuid
+from decimal import Decimal
+from functools import partial
+from django.db import IntegrityError, models, transaction
+from django.db.models import DEFERRED, F
+from django.db.models.functions import Lower
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+from .media import HashedMediaStorage, delete_image_files, file_digest, store_image
+
+class ImageBlob(models.Model):
+    """
+    A stored property image, identified by the SHA-256 of the uploaded bytes.
+    Identical uploads resolve to the same blob; ref_count is the number of
+    Property and ArchivedProperty rows using it, and the files are deleted
+    when the last one lets go.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.ImageField(upload_to='properties/', storage=HashedMediaStorage())
+    image_widths = models.JSONField(default=list, blank=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count} refs)"
+    
+    @classmethod
+    def for_file(cls, fileobj, filename):
+        """Return the blob for this file's content, storing it first if it is new."""
+        digest = file_digest(File(fileobj))
+        blob = cls.objects.filter(sha256=digest).first()
+        if blob is not None:
+            return blob
+        fileobj.seek(0, os.SEEK_END)
+        size = fileobj.tell()
+        storage = cls._meta.get_field('file').storage
+        name, widths = store_image(storage, 'properties/' + os.path.basename(filename), fileobj)
+        try:
+            with transaction.atomic():
+                return cls.objects.create(sha256=digest, file=name, image_widths=widths, size=size)
+        except IntegrityError:
+            # Another request stored the same content first
+            return cls.objects.get(sha256=digest)
+    
+    @classmethod
+    def retain(cls, pk, count=1):
+        cls.objects.filter(pk=pk).update(ref_count=F('ref_count') + count)
+    
+    @classmethod
+    def release(cls, pk):
+        with transaction.atomic():
+            blob = cls.objects.select_for_update().filter(pk=pk).first()
+            if blob is None:
+                return
+            if blob.ref_count > 1:
+                cls.objects.filter(pk=pk).update(ref_count=F('ref_count') - 1)
+                return
+            blob.delete()
+            transaction.on_commit(partial(blob.delete_files))
+    
+    def delete_files(self):
+        # Rows from before blobs existed may share the content-hashed file
+        name = self.file.name
+        if Property.objects.filter(image=name, image_blob__isnull=True).exists():
+            return
+        if ArchivedProperty.objects.filter(image=name, image_blob__isnull=True).exists():
+            return
+        delete_image_files(self.file.storage, name, self.image_widths)
 
-class Property(models.Model):
+class PropertyBase(models.Model):
+    """Listing fields shared by active properties and the sold-inventory archive."""
     PROPERTY_TYPES = [
         ('house', 'House'),
         ('apartment', 'Apartment'),
@@ -19,13 +87,23 @@ class Property(models.Model):
     bedrooms = models.PositiveIntegerField(default=0)
     bathrooms = models.DecimalField(max_digits=3, decimal_places=1, default=0)
     area = models.PositiveIntegerField(help_text="Area in square feet")
-    image = models.ImageField(upload_to='properties/', blank=True, null=True)
+    image = models.ImageField(upload_to='properties/', storage=HashedMediaStorage(), blank=True, null=True)
+    image_widths = models.JSONField(default=list, blank=True, editable=False)
+    image_blob = models.ForeignKey(ImageBlob, on_delete=models.PROTECT, null=True, blank=True, editable=False, related_name='+')
     
-    # Ownership and status
-    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='properties')
+    # Status
     is_sold = models.BooleanField(default=False)
     is_featured = models.BooleanField(default=False)
     
+    class Meta:
+        abstract = True
+    
+    def __str__(self):
+        return self.title
+
+class Property(PropertyBase):
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='properties')
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -33,23 +111,161 @@ class Property(models.Model):
     class Meta:
         verbose_name_plural = "Properties"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='property_created_idx'),
+            models.Index(Lower('title'), name='property_title_lower_idx'),
+            models.Index(Lower('location'), name='property_location_lower_idx'),
+        ]
     
-    def __str__(self):
-        return self.title
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values so save() can tell what changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
     
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
+        # New uploads are stored (or matched) as content-addressed blobs,
+        # resized and with their responsive variants written
+        if self.image and not self.image._committed:
+            blob = ImageBlob.for_file(self.image.file, self.image.name)
+            self.image = blob.file.name
+            self.image_widths = blob.image_widths
+            self.image_blob = blob
+        elif not self.image:
+            self.image_widths = []
+            self.image_blob = None
         
-        # Resize image using Pillow
-        if self.image:
-            img_path = self.image.path
-            if os.path.exists(img_path):
-                with Image.open(img_path) as img:
-                    # Resize image if it's too large
-                    if img.height > 800 or img.width > 800:
-                        output_size = (800, 800)
-                        img.thumbnail(output_size, Image.Resampling.LANCZOS)
-                        img.save(img_path, optimize=True, quality=85)
+        created = self._state.adding
+        loaded = getattr(self, '_loaded_values', {})
+        was_sold = loaded.get('is_sold', False)
+        old_price = None if created else loaded.get('price', DEFERRED)
+        old_blob = None if created else loaded.get('image_blob_id', DEFERRED)
+        new_price = Decimal(str(self.price))
+        # The outbox event and price history commit or roll back together with the row
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            PropertyEvent.record('property.created' if created else 'property.updated', self)
+            if self.is_sold and not was_sold:
+                PropertyEvent.record('property.sold', self)
+            if old_price is not DEFERRED and old_price != new_price:
+                PropertyPriceChange.objects.create(
+                    property=self, price=new_price, previous_price=old_price,
+                    is_drop=old_price is not None and new_price < old_price,
+                )
+            if old_blob is not DEFERRED and old_blob != self.image_blob_id:
+                if self.image_blob_id:
+                    ImageBlob.retain(self.image_blob_id)
+                if old_blob:
+                    ImageBlob.release(old_blob)
+        self._loaded_values = {field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields}
+    
+    def event_payload(self):
+        return {
+            'id': self.pk,
+            'owner_id': self.owner_id,
+            'title': self.title,
+            'price': str(self.price),
+            'location': self.location,
+            'property_type': self.property_type,
+            'is_sold': self.is_sold,
+            'is_featured': self.is_featured,
+        }
+
+class PropertyViewCount(models.Model):
+    """
+    Aggregated detail-page views, kept out of the Property row so counting
+    never rewrites the listing. Written in batches by properties.tracking.
+    """
+    property = models.OneToOneField(Property, on_delete=models.CASCADE, primary_key=True, related_name='view_count')
+    views = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.property_id}: {self.views}"
+
+class PropertySignature(models.Model):
+    """
+    MinHash signature of a property's text, price and area, with the
+    fields a duplicate must match exactly, for near-duplicate detection
+    (properties.duplicates). cluster_id is the
+    smallest property id of its duplicate cluster as of the last
+    `manage.py cluster_duplicate_properties` run, or null.
+    """
+    property = models.OneToOneField(Property, on_delete=models.CASCADE, primary_key=True, related_name='signature')
+    minhash = models.BinaryField()
+    price_bucket = models.IntegerField()
+    area_bucket = models.IntegerField()
+    shingle_count = models.PositiveIntegerField(default=0)
+    property_type = models.CharField(max_length=20, blank=True)
+    bedrooms = models.PositiveIntegerField(default=0)
+    bathrooms = models.DecimalField(max_digits=3, decimal_places=1, default=0)
+    cluster_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Signature of property {self.property_id}"
+
+class PropertySignatureBand(models.Model):
+    """One LSH band key of a property's signature; listings sharing a key are duplicate candidates."""
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='+')
+    bucket = models.BigIntegerField()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['bucket', 'property'], name='signature_band_idx'),
+        ]
+
+class PropertyPriceChange(models.Model):
+    """
+    Append-only price history: one row when a property is listed and one per
+    later price change. (property, changed_at) serves per-property range
+    queries; (is_drop, -changed_at) serves the recent price drops feed.
+    Once the listing is archived, property is cleared and archived_property
+    points at the cold copy.
+    """
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, null=True, blank=True, related_name='price_history')
+    archived_property = models.ForeignKey(
+        'ArchivedProperty', on_delete=models.CASCADE, null=True, blank=True, related_name='price_history'
+    )
+    price = models.DecimalField(max_digits=12, decimal_places=2)
+    previous_price = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    is_drop = models.BooleanField(default=False)
+    changed_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['changed_at']
+        indexes = [
+            models.Index(fields=['property', 'changed_at'], name='price_history_idx'),
+            models.Index(fields=['archived_property', 'changed_at'], name='archived_price_history_idx'),
+            models.Index(fields=['is_drop', '-changed_at'], name='price_drop_recent_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.property_id or self.archived_property_id}: {self.previous_price} -> {self.price}"
+
+class ArchivedProperty(PropertyBase):
+    """
+    Cold copy of a sold listing moved out of the Property table by
+    properties.archive. The primary key is the original Property id, so
+    existing links keep resolving.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_properties')
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    # The PropertyViewCount total at archiving, plus views flushed since
+    views = models.PositiveBigIntegerField(default=0)
+    
+    class Meta:
+        verbose_name_plural = "Archived properties"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['archived_at'], name='archived_property_at_idx'),
+            models.Index(Lower('title'), name='archived_title_lower_idx'),
+            models.Index(Lower('location'), name='archived_location_lower_idx'),
+        ]
 
 class PropertyPurchase(models.Model):
     STATUS_CHOICES = [
@@ -59,7 +275,9 @@ class PropertyPurchase(models.Model):
         ('cancelled', 'Cancelled'),
     ]
     
-    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='purchases')
+    # Once the sold listing is archived, property is cleared and archived_property points at the cold copy
+    property = models.ForeignKey(Property, on_delete=models.SET_NULL, null=True, blank=True, related_name='purchases')
+    archived_property = models.ForeignKey(ArchivedProperty, on_delete=models.SET_NULL, null=True, blank=True, related_name='purchases')
     buyer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='purchases')
     purchase_date = models.DateTimeField(auto_now_add=True)
     purchase_price = models.DecimalField(max_digits=12, decimal_places=2)
@@ -69,9 +287,30 @@ class PropertyPurchase(models.Model):
     class Meta:
         unique_together = ['property', 'buyer']
         ordering = ['-purchase_date']
+        indexes = [
+            models.Index(fields=['-purchase_date'], name='purchase_date_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.buyer.get_full_name()} - {self.property.title}"
+        return f"{self.buyer.get_full_name()} - {self.get_listing()}"
+    
+    def save(self, *args, **kwargs):
+        created = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            PropertyEvent.record('purchase.created' if created else 'purchase.updated', self)
+    
+    def event_payload(self):
+        return {
+            'id': self.pk,
+            'property_id': self.property_id or self.archived_property_id,
+            'buyer_id': self.buyer_id,
+            'purchase_price': str(self.purchase_price),
+            'status': self.status,
+        }
+    
+    def get_listing(self):
+        return self.property or self.archived_property
 
 class PropertyFavorite(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='favorites')
@@ -81,6 +320,112 @@ class PropertyFavorite(models.Model):
     class Meta:
         unique_together = ['user', 'property']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='favorite_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.get_full_name()} - {self.property.title}"
+    
+    def save(self, *args, **kwargs):
+        created = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if created:
+                PropertyEvent.record('favorite.added', self)
+    
+    def event_payload(self):
+        return {'id': self.pk, 'user_id': self.user_id, 'property_id': self.property_id}
+
+class ArchivedPropertyFavorite(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_favorites')
+    property = models.ForeignKey(ArchivedProperty, on_delete=models.CASCADE, related_name='favorited_by')
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
     
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.property.title}"
+
+class PropertyEvent(models.Model):
+    """
+    Append-only outbox of property lifecycle changes. Each row is written in
+    the same transaction as the change it describes. ``sequence`` is the
+    order consumers read events in; it is assigned after the row has
+    committed (properties.events.assign_sequences), so an event whose
+    transaction commits late is sequenced after everything already read
+    rather than behind a consumer's position. Consumers read it through
+    properties.events.
+    """
+    EVENT_TYPES = [
+        ('property.created', 'Property created'),
+        ('property.updated', 'Property updated'),
+        ('property.sold', 'Property sold'),
+        ('property.deleted', 'Property deleted'),
+        ('property.archived', 'Property archived'),
+        ('purchase.created', 'Purchase created'),
+        ('purchase.updated', 'Purchase updated'),
+        ('favorite.added', 'Favorite added'),
+        ('favorite.removed', 'Favorite removed'),
+    ]
+    
+    event_type = models.CharField(max_length=40, choices=EVENT_TYPES)
+    object_id = models.BigIntegerField()
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    sequence = models.BigIntegerField(null=True, blank=True, unique=True, editable=False)
+    
+    class Meta:
+        ordering = ['id']
+    
+    def __str__(self):
+        return f"#{self.pk} {self.event_type} {self.object_id}"
+    
+    @classmethod
+    def record(cls, event_type, instance):
+        return cls.objects.create(event_type=event_type, object_id=instance.pk, payload=instance.event_payload())
+    
+    @classmethod
+    def record_many(cls, event_type, instances):
+        return cls.objects.bulk_create([
+            cls(event_type=event_type, object_id=instance.pk, payload=instance.event_payload())
+            for instance in instances
+        ])
+
+class EventConsumer(models.Model):
+    """
+    Read position (an event sequence) of a named outbox consumer, plus the
+    lease on its current batch. The row named SEQUENCER holds the last
+    sequence assigned instead.
+    """
+    SEQUENCER = '__sequencer__'
+    
+    name = models.CharField(max_length=100, unique=True)
+    position = models.BigIntegerField(default=0)
+    lease_token = models.UUIDField(null=True, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name} @ {self.position}"
+
+class UploadSession(models.Model):
+    """A resumable chunked image upload; chunks are appended to a temporary file under UPLOAD_TEMP_DIR."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=200)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    blob = models.ForeignKey(ImageBlob, on_delete=models.SET_NULL, null=True, blank=True, related_name='upload_sessions')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+    
+    @property
+    def temp_path(self):
+        return os.path.join(settings.UPLOAD_TEMP_DIR, f'{self.pk}.part')
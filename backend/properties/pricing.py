@@ -0,0 +1,73 @@
+from itertools import chain, islice
+
+
+def downsample(points, buckets, start=None, end=None):
+    """
+    Reduce (changed_at, price) points, oldest first, to at most ``buckets``
+    entries over equal time slices. Each entry keeps the slice's last price
+    (the price in effect at its end) along with its low and high, so drops
+    inside a slice are not hidden.
+
+    ``points`` can be any iterable. Given the first and last timestamps as
+    ``start`` and ``end`` it is read once, as a stream, holding no more than
+    ``buckets`` points at a time; without them it is read into a list first.
+    """
+    points = iter(points)
+    head = list(islice(points, buckets + 1))
+    if len(head) <= buckets:
+        return [
+            {'changed_at': changed_at, 'price': price, 'low': price, 'high': price}
+            for changed_at, price in head
+        ]
+    if start is None or end is None:
+        points = head + list(points)
+        start, end = points[0][0], points[-1][0]
+    else:
+        points = chain(head, points)
+
+    span = (end - start) / buckets
+    result = []
+    current = None
+    current_index = None
+    for changed_at, price in points:
+        index = min(int((changed_at - start) / span), buckets - 1) if span else 0
+        if index != current_index:
+            current = {'changed_at': changed_at, 'price': price, 'low': price, 'high': price}
+            current_index = index
+            result.append(current)
+        else:
+            current['changed_at'] = changed_at
+            current['price'] = price
+            current['low'] = min(current['low'], price)
+            current['high'] = max(current['high'], price)
+    return result
+
+
+def recent_price_drops(limit, max_rounds=10):
+    """
+    The newest ``limit`` price drops on unsold listings. Candidate ids are
+    read newest first from price_drop_recent_idx alone; the rows and their
+    listings are then loaded by primary key, so the cost does not grow with
+    the size of the history table.
+    """
+    from .models import PropertyPriceChange
+
+    # "IN (true)" rather than "= true": SQLite compiles the latter to a bare
+    # column test that cannot use the (is_drop, changed_at) index
+    candidates = PropertyPriceChange.objects.filter(is_drop__in=[True]).order_by('-changed_at')
+    drops = []
+    batch = limit * 2
+    for round_number in range(max_rounds):
+        offset = round_number * batch
+        ids = list(candidates.values_list('pk', flat=True)[offset:offset + batch])
+        if not ids:
+            break
+        rows = (
+            PropertyPriceChange.objects.filter(pk__in=ids, property__is_sold=False)
+            .select_related('property__owner').order_by()
+        )
+        by_id = {row.pk: row for row in rows}
+        drops.extend(by_id[pk] for pk in ids if pk in by_id)
+        if len(drops) >= limit:
+            break
+    return drops[:limit]
@@ -0,0 +1,138 @@
+"""
+Read-only serializers for the list endpoints that build each row straight
+from a .values_list() tuple. The converters for decimals, datetimes and
+image URLs are set up once per response instead of per field per row, and
+no model instances are created. The output matches PropertyListSerializer,
+OwnerPropertyListSerializer and PropertyFavoriteSerializer exactly.
+"""
+import decimal
+
+from django.utils import timezone
+from django.utils.encoding import iri_to_uri
+
+from .media import variant_name
+from .models import Property
+from .tracking import view_tracker
+
+
+def decimal_converter(model, field_name):
+    # Same quantizing as rest_framework.fields.DecimalField.to_representation
+    field = model._meta.get_field(field_name)
+    quantum = decimal.Decimal('.1') ** field.decimal_places
+    context = decimal.getcontext().copy()
+    context.prec = field.max_digits
+
+    def convert(value):
+        if value is None:
+            return ''
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value).strip())
+        return f'{value.quantize(quantum, context=context):f}'
+    return convert
+
+
+def datetime_converter():
+    # ISO 8601 in the current time zone, as rest_framework.fields.DateTimeField
+    tz = timezone.get_current_timezone()
+
+    def convert(value):
+        if not value:
+            return None
+        value = value.astimezone(tz) if timezone.is_aware(value) else timezone.make_aware(value, tz)
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
+
+
+def url_converter(storage, request):
+    # Absolute URLs are built from the request's scheme and host once,
+    # rather than through request.build_absolute_uri() for every image
+    host = request.build_absolute_uri('/')[:-1] if request is not None else None
+
+    def absolute(url):
+        if host is None:
+            return url
+        if url.startswith('/') and not url.startswith('//') and '/./' not in url and '/../' not in url:
+            return iri_to_uri(host + url)
+        return request.build_absolute_uri(url)
+
+    def image_url(name):
+        if not name:
+            return None
+        return absolute(storage.url(name))
+
+    def srcset(name, widths):
+        if not name or not widths:
+            return None
+        url = storage.url(name)
+        candidates = [f'{absolute(variant_name(url, width))} {width}w' for width in widths[:-1]]
+        candidates.append(f'{absolute(url)} {widths[-1]}w')
+        return ', '.join(candidates)
+    return image_url, srcset
+
+
+class PropertyListRows:
+    """Rows of PropertyListSerializer from Property.objects.values_list(*columns)."""
+    columns = (
+        'id', 'title', 'price', 'location', 'property_type', 'bedrooms', 'bathrooms', 'area',
+        'image', 'image_widths', 'owner__first_name', 'owner__last_name', 'is_sold', 'is_featured',
+        'created_at',
+    )
+
+    def __init__(self, request=None):
+        self.price = decimal_converter(Property, 'price')
+        self.bathrooms = decimal_converter(Property, 'bathrooms')
+        self.datetime = datetime_converter()
+        self.image_url, self.srcset = url_converter(Property._meta.get_field('image').storage, request)
+
+    def row(self, values):
+        (pk, title, price, location, property_type, bedrooms, bathrooms, area, image, image_widths,
+         first_name, last_name, is_sold, is_featured, created_at) = values[:15]
+        return {
+            'id': pk,
+            'title': title,
+            'price': self.price(price),
+            'location': location,
+            'property_type': property_type,
+            'bedrooms': bedrooms,
+            'bathrooms': self.bathrooms(bathrooms),
+            'area': area,
+            'image': self.image_url(image),
+            'image_srcset': self.srcset(image, image_widths),
+            'owner_name': f'{first_name} {last_name}',
+            'is_sold': is_sold,
+            'is_featured': is_featured,
+            'created_at': self.datetime(created_at),
+        }
+
+    def serialize(self, rows):
+        row = self.row
+        return [row(values) for values in rows]
+
+
+class OwnerPropertyListRows(PropertyListRows):
+    """Rows of OwnerPropertyListSerializer; the queryset must annotate ``views``."""
+    columns = PropertyListRows.columns + ('views',)
+
+    def row(self, values):
+        data = super().row(values)
+        data['views'] = values[15] + view_tracker.pending(values[0])
+        return data
+
+
+class PropertyFavoriteRows:
+    """Rows of PropertyFavoriteSerializer from PropertyFavorite.objects.values_list(*columns)."""
+    columns = ('id', 'created_at') + tuple(f'property__{column}' for column in PropertyListRows.columns)
+
+    def __init__(self, request=None):
+        self.property_rows = PropertyListRows(request)
+        self.datetime = self.property_rows.datetime
+
+    def serialize(self, rows):
+        property_row = self.property_rows.row
+        return [
+            {'id': values[0], 'property': property_row(values[2:]), 'created_at': self.datetime(values[1])}
+            for values in rows
+        ]
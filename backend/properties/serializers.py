@@ -1,43 +1,146 @@
-from rest_framework import serializers
-from .models import Property, PropertyPurchase, PropertyFavorite
+import os
+from django.conf import settings
+from rest_framework import exceptions, serializers, status
+from .models import (
+    ArchivedProperty, Property, PropertyPurchase, PropertyFavorite, PropertyPriceChange, PropertyViewCount,
+    UploadSession
+)
 from accounts.serializers import UserSerializer
+from .duplicates import SIGNATURE_FIELDS, find_duplicates, record_duplicates, signature_for
+from .media import build_srcset
+from .tracking import view_tracker
 
-class PropertySerializer(serializers.ModelSerializer):
+
+class DuplicateListing(exceptions.APIException):
+    """
+    400 response listing the ids a new property duplicates. Raised instead of
+    a ValidationError, which would turn the ids into strings.
+    """
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_code = 'duplicate'
+
+    def __init__(self, duplicates):
+        super().__init__({'non_field_errors': ['This listing looks like a duplicate of an existing one.']})
+        self.detail['duplicate_of'] = duplicates
+
+
+class ImageSrcsetMixin:
+    def get_image_srcset(self, obj):
+        return build_srcset(obj.image, obj.image_widths, self.context.get('request'))
+
+class ViewCountMixin:
+    def get_views(self, obj):
+        # Prefer the queryset annotation; fall back to the related row
+        views = getattr(obj, 'views', None)
+        if views is None:
+            try:
+                views = obj.view_count.views
+            except PropertyViewCount.DoesNotExist:
+                views = 0
+        return views + view_tracker.pending(obj.pk)
+
+class PropertySerializer(ImageSrcsetMixin, ViewCountMixin, serializers.ModelSerializer):
     owner = UserSerializer(read_only=True)
     image = serializers.ImageField(required=False)
+    image_srcset = serializers.SerializerMethodField()
+    # Id of a completed chunked upload, as an alternative to a multipart image
+    image_upload = serializers.UUIDField(write_only=True, required=False)
+    views = serializers.SerializerMethodField()
     
     class Meta:
         model = Property
         fields = [
             'id', 'title', 'description', 'price', 'location', 'property_type',
-            'bedrooms', 'bathrooms', 'area', 'image', 'owner', 'is_sold',
-            'is_featured', 'created_at', 'updated_at'
+            'bedrooms', 'bathrooms', 'area', 'image', 'image_srcset', 'owner', 'is_sold',
+            'is_featured', 'views', 'image_upload', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'owner', 'created_at', 'updated_at']
     
+    def validate_image_upload(self, value):
+        session = UploadSession.objects.select_related('blob').filter(
+            pk=value, owner=self.context['request'].user
+        ).first()
+        if session is None:
+            raise serializers.ValidationError('Unknown upload.')
+        if session.blob is None:
+            raise serializers.ValidationError('Upload is not complete.')
+        return session.blob
+    
+    def validate(self, attrs):
+        if self.instance is None and settings.PROPERTY_REJECT_DUPLICATES:
+            # Unset fields take the model defaults
+            listing = Property(**{name: attrs[name] for name in SIGNATURE_FIELDS if name in attrs})
+            duplicates = find_duplicates(signature_for(listing))
+            if duplicates:
+                raise DuplicateListing(duplicates)
+        return attrs
+    
+    def _apply_image_upload(self, validated_data):
+        blob = validated_data.pop('image_upload', None)
+        if blob is not None:
+            validated_data['image'] = blob.file.name
+            validated_data['image_widths'] = blob.image_widths
+            validated_data['image_blob'] = blob
+        return validated_data
+    
     def create(self, validated_data):
         validated_data['owner'] = self.context['request'].user
-        return super().create(validated_data)
+        instance = super().create(self._apply_image_upload(validated_data))
+        if not settings.PROPERTY_REJECT_DUPLICATES:
+            record_duplicates(instance)
+        return instance
+    
+    def update(self, instance, validated_data):
+        return super().update(instance, self._apply_image_upload(validated_data))
 
-class PropertyListSerializer(serializers.ModelSerializer):
+class PropertyListSerializer(ImageSrcsetMixin, serializers.ModelSerializer):
     owner_name = serializers.CharField(source='owner.full_name', read_only=True)
+    image_srcset = serializers.SerializerMethodField()
     
     class Meta:
         model = Property
         fields = [
             'id', 'title', 'price', 'location', 'property_type',
-            'bedrooms', 'bathrooms', 'area', 'image', 'owner_name',
+            'bedrooms', 'bathrooms', 'area', 'image', 'image_srcset', 'owner_name',
             'is_sold', 'is_featured', 'created_at'
         ]
 
+class OwnerPropertyListSerializer(ViewCountMixin, PropertyListSerializer):
+    views = serializers.SerializerMethodField()
+    
+    class Meta(PropertyListSerializer.Meta):
+        fields = PropertyListSerializer.Meta.fields + ['views']
+
+class ArchivedPropertySerializer(ImageSrcsetMixin, ViewCountMixin, serializers.ModelSerializer):
+    owner = UserSerializer(read_only=True)
+    image_srcset = serializers.SerializerMethodField()
+    views = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ArchivedProperty
+        fields = [
+            'id', 'title', 'description', 'price', 'location', 'property_type',
+            'bedrooms', 'bathrooms', 'area', 'image', 'image_srcset', 'owner', 'is_sold',
+            'is_featured', 'views', 'created_at', 'updated_at', 'archived_at'
+        ]
+        read_only_fields = fields
+
 class PropertyPurchaseSerializer(serializers.ModelSerializer):
-    property = PropertySerializer(read_only=True)
+    # Resolves to the archived copy once the sold listing has been archived
+    property = serializers.SerializerMethodField()
     buyer = UserSerializer(read_only=True)
     
     class Meta:
         model = PropertyPurchase
         fields = ['id', 'property', 'buyer', 'purchase_date', 'purchase_price', 'status', 'notes']
         read_only_fields = ['id', 'buyer', 'purchase_date']
+    
+    def get_property(self, obj):
+        if obj.property_id is not None:
+            return PropertySerializer(obj.property, context=self.context).data
+        if obj.archived_property_id is not None:
+            return ArchivedPropertySerializer(obj.archived_property, context=self.context).data
+        return None
 
 class PropertyFavoriteSerializer(serializers.ModelSerializer):
     property = PropertyListSerializer(read_only=True)
@@ -46,3 +149,45 @@ class PropertyFavoriteSerializer(serializers.ModelSerializer):
         model = PropertyFavorite
         fields = ['id', 'property', 'created_at']
         read_only_fields = ['id', 'created_at']
+
+class PricePointSerializer(serializers.Serializer):
+    changed_at = serializers.DateTimeField()
+    price = serializers.DecimalField(max_digits=12, decimal_places=2)
+    low = serializers.DecimalField(max_digits=12, decimal_places=2)
+    high = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+class PriceDropSerializer(serializers.ModelSerializer):
+    property = PropertyListSerializer(read_only=True)
+    drop_percent = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = PropertyPriceChange
+        fields = ['id', 'property', 'previous_price', 'price', 'drop_percent', 'changed_at']
+    
+    def get_drop_percent(self, obj):
+        if not obj.previous_price:
+            return None
+        return round(float((obj.previous_price - obj.price) / obj.previous_price * 100), 2)
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    offset = serializers.IntegerField(source='received', read_only=True)
+    complete = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'filename', 'size', 'offset', 'complete', 'created_at']
+        read_only_fields = ['id', 'created_at']
+    
+    def validate_filename(self, value):
+        extension = os.path.splitext(value)[1].lower()
+        if extension not in settings.UPLOAD_IMAGE_EXTENSIONS:
+            raise serializers.ValidationError(f'Unsupported image type "{extension}".')
+        return os.path.basename(value)
+    
+    def validate_size(self, value):
+        if not 0 < value <= settings.UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f'Size must be between 1 and {settings.UPLOAD_MAX_SIZE} bytes.')
+        return value
+    
+    def get_complete(self, obj):
+        return obj.blob_id is not None
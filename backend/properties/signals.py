@@ -0,0 +1,102 @@
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DEFERRED
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from accounts.serializers import UserSerializer
+
+from .archive import archiving
+from .batch import property_cache
+from .duplicates import INDEXED_FIELDS, index_properties
+from .locations import location_index
+from .models import ArchivedProperty, ImageBlob, Property, PropertyEvent, PropertyFavorite
+
+
+# Deletes run inside the collector's transaction, so these events commit with
+# them. Archiving deletes too, but records its own property.archived events.
+
+@receiver(post_delete, sender=Property)
+def record_property_deleted(sender, instance, **kwargs):
+    if not archiving.get():
+        PropertyEvent.record('property.deleted', instance)
+
+
+@receiver(post_delete, sender=PropertyFavorite)
+def record_favorite_removed(sender, instance, **kwargs):
+    if not archiving.get():
+        PropertyEvent.record('favorite.removed', instance)
+
+
+@receiver(post_delete, sender=Property)
+@receiver(post_delete, sender=ArchivedProperty)
+def release_image_blob(sender, instance, **kwargs):
+    if instance.image_blob_id:
+        ImageBlob.release(instance.image_blob_id)
+
+
+# The location index counts unsold listings per location; it is adjusted
+# once the change commits. Saves whose previous state was not loaded are
+# left to the index's periodic rebuild.
+
+@receiver(pre_save, sender=Property)
+def remember_indexed_location(sender, instance, **kwargs):
+    loaded = getattr(instance, '_loaded_values', {})
+    if instance._state.adding:
+        instance._indexed_location = None
+    elif 'location' in loaded and 'is_sold' in loaded:
+        instance._indexed_location = None if loaded['is_sold'] else loaded['location']
+    else:
+        instance._indexed_location = DEFERRED
+
+
+@receiver(post_save, sender=Property)
+def update_location_index(sender, instance, **kwargs):
+    old = getattr(instance, '_indexed_location', DEFERRED)
+    new = None if instance.is_sold else instance.location
+    if old is not DEFERRED and old != new:
+        transaction.on_commit(partial(location_index.move, old, new))
+
+
+@receiver(post_delete, sender=Property)
+def remove_from_location_index(sender, instance, **kwargs):
+    if not instance.is_sold:
+        transaction.on_commit(partial(location_index.move, instance.location, None))
+
+
+# Cached batch payloads embed the property and its owner
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+@receiver(post_save, sender=ArchivedProperty)
+@receiver(post_delete, sender=ArchivedProperty)
+def invalidate_cached_property(sender, instance, **kwargs):
+    property_cache.invalidate(instance.pk)
+    transaction.on_commit(partial(property_cache.invalidate, instance.pk))
+
+
+# The owner fields the cached payloads show
+OWNER_FIELDS = frozenset(UserSerializer.Meta.fields)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_owner(sender, instance, update_fields=None, **kwargs):
+    # Logins save last_login alone, which no payload shows
+    if update_fields is not None and OWNER_FIELDS.isdisjoint(update_fields):
+        return
+    property_cache.invalidate_owner(instance.pk)
+    transaction.on_commit(partial(property_cache.invalidate_owner, instance.pk))
+
+
+# Keep the near-duplicate index in step with the listing; selling it drops its band keys
+
+@receiver(post_save, sender=Property)
+def update_property_signature(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    # post_save runs before Property.save() refreshes _loaded_values
+    loaded = getattr(instance, '_loaded_values', {})
+    if created or any(loaded.get(name, DEFERRED) != getattr(instance, name) for name in INDEXED_FIELDS):
+        index_properties([instance])
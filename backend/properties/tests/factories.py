@@ -0,0 +1,19 @@
+from itertools import count
+
+from django.contrib.auth import get_user_model
+
+from properties.models import Property
+
+_serial = count(1)
+
+
+def make_user(**fields):
+    n = next(_serial)
+    defaults = {'email': f'user{n}@example.com', 'username': f'user{n}', 'first_name': 'Test', 'last_name': f'User{n}'}
+    return get_user_model().objects.create_user(**{**defaults, **fields})
+
+
+def make_property(owner=None, **fields):
+    n = next(_serial)
+    defaults = {'title': f'Listing {n}', 'price': 100000, 'location': 'Pune', 'area': 1000}
+    return Property.objects.create(owner=owner or make_user(), **{**defaults, **fields})
@@ -0,0 +1,83 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from rest_framework.test import APITestCase
+
+from properties.archive import ArchiveConflict, archive_batch, archive_sold_properties
+from properties.models import (
+    ArchivedProperty, ArchivedPropertyFavorite, Property, PropertyEvent, PropertyFavorite, PropertyPriceChange,
+    PropertyPurchase, PropertyViewCount,
+)
+
+from .factories import make_property, make_user
+
+
+class ArchiveTests(APITestCase):
+    def setUp(self):
+        self.buyer = make_user()
+        self.sold = make_property(title='Sea view flat', price=250000, is_sold=True)
+        self.sold.price = 240000
+        self.sold.save()
+        self.active = make_property()
+        PropertyViewCount.objects.create(property=self.sold, views=12)
+        self.favorite = PropertyFavorite.objects.create(user=self.buyer, property=self.sold)
+        self.purchase = PropertyPurchase.objects.create(property=self.sold, buyer=self.buyer, purchase_price=240000)
+
+    def archive(self):
+        return list(archive_sold_properties(older_than_days=0))
+
+    def test_round_trip(self):
+        self.assertEqual(self.archive(), [1])
+
+        self.assertFalse(Property.objects.filter(pk=self.sold.pk).exists())
+        self.assertTrue(Property.objects.filter(pk=self.active.pk).exists())
+        archived = ArchivedProperty.objects.get(pk=self.sold.pk)
+        self.assertEqual((archived.title, archived.price, archived.views), ('Sea view flat', 240000, 12))
+        self.assertEqual(archived.owner_id, self.sold.owner_id)
+
+        favorite = ArchivedPropertyFavorite.objects.get(pk=self.favorite.pk)
+        self.assertEqual((favorite.user_id, favorite.property_id), (self.buyer.pk, self.sold.pk))
+        purchase = PropertyPurchase.objects.get(pk=self.purchase.pk)
+        self.assertEqual((purchase.property_id, purchase.archived_property_id), (None, self.sold.pk))
+        self.assertEqual(
+            list(PropertyPriceChange.objects.filter(archived_property_id=self.sold.pk).values_list('price', flat=True)),
+            [250000, 240000],
+        )
+        self.assertEqual(
+            list(PropertyEvent.objects.filter(object_id=self.sold.pk).values_list('event_type', flat=True))[-1],
+            'property.archived',
+        )
+        self.assertFalse(PropertyEvent.objects.filter(event_type='property.deleted').exists())
+
+    def test_detail_and_price_history_fall_back_to_the_archive(self):
+        self.archive()
+        response = self.client.get(f'/api/properties/{self.sold.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['title'], 'Sea view flat')
+
+        response = self.client.get(f'/api/properties/{self.sold.pk}/price-history/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([point['price'] for point in response.data['points']], ['250000.00', '240000.00'])
+
+        self.assertEqual(self.client.get('/api/properties/999999/').status_code, 404)
+
+    def test_existing_archived_copy_fails_the_batch(self):
+        ArchivedProperty.objects.create(
+            id=self.sold.pk, title='Old copy', price=1, location='Pune', area=1,
+            owner=self.sold.owner, created_at=self.sold.created_at, updated_at=self.sold.updated_at,
+        )
+        with self.assertRaises(ArchiveConflict) as caught:
+            with transaction.atomic():
+                archive_batch([self.sold.pk])
+        self.assertEqual(caught.exception.ids, [self.sold.pk])
+
+        # Nothing was moved or lost
+        self.assertTrue(Property.objects.filter(pk=self.sold.pk).exists())
+        self.assertEqual(ArchivedProperty.objects.get(pk=self.sold.pk).title, 'Old copy')
+        self.assertTrue(PropertyFavorite.objects.filter(pk=self.favorite.pk).exists())
+        self.assertEqual(PropertyPurchase.objects.get(pk=self.purchase.pk).property_id, self.sold.pk)
+
+        with self.assertRaises(CommandError):
+            call_command('archive_sold_properties', older_than_days=0, stdout=StringIO())
+        self.assertTrue(Property.objects.filter(pk=self.sold.pk).exists())
@@ -0,0 +1,78 @@
+from django.contrib.auth.models import update_last_login
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from properties.archive import archive_sold_properties
+from properties.batch import PropertyCache, property_cache
+from properties.models import ArchivedProperty
+
+from .factories import make_property, make_user
+
+
+class PropertyBatchTests(APITestCase):
+    def setUp(self):
+        property_cache.clear()
+        self.addCleanup(property_cache.clear)
+        self.owner = make_user(first_name='Meera')
+        self.first = make_property(owner=self.owner, title='First')
+        self.second = make_property(owner=self.owner, title='Second')
+
+    def batch(self, *ids):
+        response = self.client.get('/api/properties/batch/', {'ids': ','.join(map(str, ids))})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def titles(self, *ids):
+        return [item['title'] for item in self.batch(*ids)['results']]
+
+    def test_results_keep_the_requested_order(self):
+        data = self.batch(self.second.pk, 999999, self.first.pk)
+        self.assertEqual([item['title'] for item in data['results']], ['Second', 'First'])
+        self.assertEqual(data['missing'], [999999])
+
+    def test_saving_a_property_drops_its_entry(self):
+        self.assertEqual(self.titles(self.first.pk), ['First'])
+        self.first.title = 'Renamed'
+        self.first.save()
+        self.assertEqual(self.titles(self.first.pk), ['Renamed'])
+
+    def test_owner_changes_drop_their_entries(self):
+        self.batch(self.first.pk, self.second.pk)
+        self.owner.first_name = 'Mira'
+        self.owner.save()
+        owners = [item['owner']['first_name'] for item in self.batch(self.first.pk, self.second.pk)['results']]
+        self.assertEqual(owners, ['Mira', 'Mira'])
+
+    def test_logins_keep_the_entries(self):
+        self.batch(self.first.pk, self.second.pk)
+        update_last_login(None, self.owner)
+        self.assertEqual(len(property_cache._entries), 2)
+
+    def test_archived_listings_are_served_and_invalidated(self):
+        sold = make_property(owner=self.owner, title='Sold', is_sold=True)
+        list(archive_sold_properties(older_than_days=0))
+        self.assertEqual(self.titles(sold.pk), ['Sold'])
+
+        archived = ArchivedProperty.objects.get(pk=sold.pk)
+        archived.owner = make_user(first_name='Kiran')
+        archived.save()
+        self.assertEqual(self.batch(sold.pk)['results'][0]['owner']['first_name'], 'Kiran')
+
+        archived.delete()
+        self.assertEqual(self.batch(sold.pk)['missing'], [sold.pk])
+
+
+@override_settings(PROPERTY_CACHE_TTL=60, PROPERTY_CACHE_MAX_ENTRIES=2)
+class PropertyCacheTests(TestCase):
+    def test_owner_index_follows_the_entries(self):
+        cache = PropertyCache()
+        cache.set_many('s', [(1, 10, 'a'), (2, 10, 'b')])
+        cache.set_many('s', [(2, 20, 'b')])
+        self.assertEqual(cache._by_owner, {10: {('s', 1)}, 20: {('s', 2)}})
+
+        cache.set_many('s', [(3, 20, 'c')])
+        # The least recently used entry went, and with it owner 10's index
+        self.assertEqual(cache._by_owner, {20: {('s', 2), ('s', 3)}})
+
+        cache.invalidate_owner(20)
+        self.assertEqual((len(cache._entries), cache._by_owner), (0, {}))
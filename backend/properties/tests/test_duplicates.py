@@ -0,0 +1,98 @@
+import importlib
+import inspect
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from properties.duplicates import (
+    SIGNATURE_FIELDS, compute_signature, find_duplicates, is_indexed, signature_for,
+)
+from properties.models import Property, PropertySignature, PropertySignatureBand
+
+from .factories import make_property, make_user
+
+LISTING = {
+    'title': 'Spacious three bedroom apartment with sea view',
+    'description': 'Corner flat on the tenth floor with two balconies, covered parking and a gym in the building.',
+    'location': 'Bandra West, Mumbai',
+    'price': Decimal('25000000.00'),
+    'area': 1450,
+    'property_type': 'apartment',
+    'bedrooms': 3,
+    'bathrooms': Decimal('2.0'),
+}
+# The same listing as a client posts it
+PAYLOAD = {**LISTING, 'price': '25000000.00', 'bathrooms': '2.0'}
+
+
+class DuplicateIndexTests(TestCase):
+    def test_signature_fields_follow_compute_signature(self):
+        self.assertEqual(tuple(inspect.signature(compute_signature).parameters), SIGNATURE_FIELDS)
+
+    def test_migration_counts_shingles_as_the_index_does(self):
+        migration = importlib.import_module('properties.migrations.0013_signature_match_fields')
+        for listing in (LISTING, {**LISTING, 'description': ''}, {**LISTING, 'title': '', 'description': '', 'location': ''}):
+            self.assertEqual(
+                migration.shingle_count(listing['title'], listing['description'], listing['location']),
+                signature_for(Property(**listing)).shingle_count,
+            )
+
+    def test_near_identical_listing_is_found(self):
+        original = make_property(**LISTING)
+        copy = Property(**{**LISTING, 'description': LISTING['description'] + ' Available now.'})
+        self.assertEqual(find_duplicates(signature_for(copy)), [original.pk])
+
+    def test_different_bedrooms_are_not_duplicates(self):
+        make_property(**LISTING)
+        self.assertEqual(find_duplicates(signature_for(Property(**{**LISTING, 'bedrooms': 4}))), [])
+
+    def test_short_texts_are_never_duplicates(self):
+        short = {**LISTING, 'title': '2 bed flat', 'description': '', 'location': 'Pune'}
+        listing = make_property(**short)
+        self.assertFalse(is_indexed(listing, signature_for(listing)))
+        self.assertFalse(PropertySignatureBand.objects.filter(property=listing).exists())
+        self.assertEqual(find_duplicates(signature_for(Property(**short))), [])
+
+    def test_selling_drops_the_listing_from_the_index(self):
+        listing = make_property(**LISTING)
+        self.assertTrue(PropertySignatureBand.objects.filter(property=listing).exists())
+        listing.is_sold = True
+        listing.save()
+        self.assertFalse(PropertySignatureBand.objects.filter(property=listing).exists())
+        self.assertEqual(find_duplicates(signature_for(Property(**LISTING))), [])
+
+    def test_editing_the_text_updates_the_signature(self):
+        listing = make_property(**LISTING)
+        listing.title = 'Independent bungalow with a private garden and pool'
+        listing.description = 'Quiet lane, four car parks, servant quarters and a rooftop terrace.'
+        listing.save()
+        self.assertEqual(find_duplicates(signature_for(Property(**LISTING))), [])
+        stored = PropertySignature.objects.get(property=listing)
+        self.assertEqual(bytes(stored.minhash), signature_for(listing).minhash)
+
+
+class DuplicateListingAPITests(APITestCase):
+    def setUp(self):
+        self.original = make_property(**LISTING)
+        self.client.force_authenticate(make_user())
+
+    @override_settings(PROPERTY_REJECT_DUPLICATES=True)
+    def test_duplicate_is_rejected_with_integer_ids(self):
+        response = self.client.post('/api/properties/', PAYLOAD, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['duplicate_of'], [self.original.pk])
+        self.assertEqual(Property.objects.count(), 1)
+
+    @override_settings(PROPERTY_REJECT_DUPLICATES=True)
+    def test_distinct_listing_is_accepted(self):
+        listing = {**PAYLOAD, 'title': 'Row house near the station', 'description': 'Two storeys, small garden and a terrace.', 'bedrooms': 2}
+        self.assertEqual(self.client.post('/api/properties/', listing, format='json').status_code, 201)
+
+    @override_settings(PROPERTY_REJECT_DUPLICATES=False)
+    def test_duplicate_is_recorded_by_default(self):
+        response = self.client.post('/api/properties/', PAYLOAD, format='json')
+        self.assertEqual(response.status_code, 201)
+        clusters = PropertySignature.objects.filter(property__in=[self.original.pk, response.data['id']])
+        self.assertEqual(set(clusters.values_list('cluster_id', flat=True)), {self.original.pk})
+        self.assertEqual(Property.objects.get(pk=response.data['id']).price, LISTING['price'])
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from properties import events
+from properties.models import EventConsumer, PropertyEvent
+
+
+def event(pk, created_at=None):
+    PropertyEvent.objects.create(pk=pk, event_type='property.updated', object_id=pk, payload={})
+    if created_at:
+        # created_at is auto_now_add, so backdate it afterwards
+        PropertyEvent.objects.filter(pk=pk).update(created_at=created_at)
+
+
+class OutboxConsumerTests(TestCase):
+    def test_event_committed_after_a_higher_id_is_not_skipped(self):
+        event(100)
+        batch = events.claim('search')
+        self.assertEqual([e.pk for e in batch], [100])
+        self.assertEqual(events.acknowledge('search', batch[-1].sequence, batch.lease), 1)
+
+        # A transaction that took id 50 but committed only now, long after its insert
+        event(50, created_at=timezone.now() - timedelta(minutes=5))
+        batch = events.claim('search')
+        self.assertEqual([e.pk for e in batch], [50])
+        self.assertGreater(batch[0].sequence, events.position('search'))
+
+    def test_sequences_follow_commit_order(self):
+        event(10)
+        events.assign_sequences()
+        event(5)
+        event(7)
+        events.assign_sequences()
+        self.assertEqual(
+            list(PropertyEvent.objects.order_by('sequence').values_list('pk', flat=True)), [10, 5, 7]
+        )
+
+    def test_claim_is_empty_while_another_lease_is_live(self):
+        event(1)
+        self.assertEqual(len(events.claim('search')), 1)
+        self.assertEqual(events.claim('search'), [])
+
+    def test_expired_lease_cannot_acknowledge(self):
+        event(1)
+        event(2)
+        stale = events.claim('search', limit=1)
+        EventConsumer.objects.filter(name='search').update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+
+        current = events.claim('search')
+        self.assertEqual([e.pk for e in current], [1, 2])
+        self.assertEqual(events.acknowledge('search', stale[-1].sequence, stale.lease), 0)
+        self.assertEqual(events.position('search'), 0)
+        self.assertEqual(events.acknowledge('search', current[-1].sequence, current.lease), 1)
+        self.assertEqual(events.position('search'), current[-1].sequence)
+
+    def test_lease_expired_without_a_new_claim_cannot_acknowledge(self):
+        event(1)
+        batch = events.claim('search')
+        EventConsumer.objects.filter(name='search').update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(events.acknowledge('search', batch[-1].sequence, batch.lease), 0)
+        self.assertEqual(events.position('search'), 0)
+
+    def test_seek_replays_from_position(self):
+        event(1)
+        event(2)
+        batch = events.claim('search')
+        events.acknowledge('search', batch[-1].sequence, batch.lease)
+        events.seek('search', batch[0].sequence)
+        self.assertEqual([e.pk for e in events.claim('search')], [2])
+
+    def test_prune_removes_only_expired_events(self):
+        event(1, created_at=timezone.now() - timedelta(days=8))
+        event(2)
+        self.assertEqual(events.prune(retention_days=7), 1)
+        self.assertEqual(list(PropertyEvent.objects.values_list('pk', flat=True)), [2])
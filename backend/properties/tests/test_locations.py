@@ -0,0 +1,172 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from properties import locations, signals, views
+from properties.locations import LocationIndex, normalize_location
+from properties.models import Property
+
+from .factories import make_property, make_user
+
+
+def built_index(rows=()):
+    index = LocationIndex()
+    index.load(rows)
+    # Loaded by hand; no background thread
+    index._pid = locations.os.getpid()
+    return index
+
+
+class LocationIndexTests(SimpleTestCase):
+    def test_prefix_matches_are_ranked_by_listing_count(self):
+        index = built_index([('Pune', 3), ('Punjab', 5), ('Mumbai', 9), ('Navi Mumbai', 1)])
+        self.assertEqual(index.suggest('pun'), [('Punjab', 5), ('Pune', 3)])
+        self.assertEqual(index.suggest('pun', limit=1), [('Punjab', 5)])
+        self.assertEqual(index.suggest('mumbai'), [('Mumbai', 9)])
+        self.assertEqual(index.suggest('x'), [])
+
+    def test_spellings_are_merged_under_the_most_common(self):
+        index = built_index([('Navi  Mumbai', 1), ('navi mumbai', 2), ('NAVI MUMBAI', 4)])
+        self.assertEqual(index.suggest('  Navi m'), [('NAVI MUMBAI', 7)])
+        self.assertEqual(normalize_location(' Navi\tMUMBAI '), 'navi mumbai')
+
+    def test_trailing_space_ends_the_word(self):
+        index = built_index([('Pune', 1), ('Pune Camp', 2)])
+        self.assertEqual(index.suggest('pune '), [('Pune Camp', 2)])
+
+    def test_limit_is_capped(self):
+        index = built_index([(f'Town {n}', n) for n in range(1, 40)])
+        self.assertEqual(len(index.suggest('town', limit=100)), locations.MAX_SUGGESTIONS)
+
+    def test_wide_ranges_use_a_cached_top_list_that_moves_reset(self):
+        with mock.patch.object(locations, 'SCAN_LIMIT', 2):
+            index = built_index([('Pune', 3), ('Punjab', 2), ('Puri', 1)])
+            self.assertIn('pu', index._top)
+            self.assertEqual(index.suggest('pu', limit=2), [('Pune', 3), ('Punjab', 2)])
+            for _ in range(3):
+                index.move(None, 'Puri')
+            self.assertNotIn('pu', index._top)
+            self.assertEqual(index.suggest('pu', limit=2), [('Puri', 4), ('Pune', 3)])
+
+    def test_move_adds_and_removes_locations(self):
+        index = built_index([('Pune', 1)])
+        index.move('Pune', 'Nagpur')
+        self.assertEqual(index.suggest(''), [('Nagpur', 1)])
+        index.move('Nagpur', None)
+        self.assertEqual(index.suggest(''), [])
+        self.assertEqual((index._keys, index._counts, index._labels), ([], {}, {}))
+
+    def test_moves_before_the_first_build_are_ignored(self):
+        index = LocationIndex()
+        index.move(None, 'Pune')
+        self.assertEqual(index._counts, {})
+
+
+class LocationIndexBuildTests(TestCase):
+    def test_serves_nothing_until_the_background_build_finishes(self):
+        make_property(location='Pune')
+        index = LocationIndex()
+        with mock.patch.object(locations.threading, 'Thread') as thread:
+            self.assertEqual(index.suggest('pu'), [])
+            self.assertEqual(index.suggest('pu'), [])
+        thread.assert_called_once()
+        self.assertEqual(thread.call_args.kwargs['target'], index._run)
+        thread.return_value.start.assert_called_once()
+
+        index.rebuild()
+        self.assertEqual(index.suggest('pu'), [('Pune', 1)])
+
+    def test_rebuild_counts_unsold_listings(self):
+        owner = make_user()
+        make_property(owner, location='Pune')
+        make_property(owner, location='pune ')
+        make_property(owner, location='Nagpur', is_sold=True)
+        index = built_index()
+        index.rebuild()
+        self.assertEqual(index.suggest(''), [('Pune', 2)])
+
+
+class LocationIndexSignalTests(TestCase):
+    def setUp(self):
+        self.index = built_index()
+        patcher = mock.patch.object(signals, 'location_index', self.index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def suggestions(self):
+        return self.index.suggest('')
+
+    def test_changes_apply_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            make_property(location='Pune')
+        self.assertEqual(self.suggestions(), [])
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.suggestions(), [('Pune', 1)])
+
+    def test_saves_move_the_listing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            prop = make_property(location='Pune')
+        prop = Property.objects.get(pk=prop.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            prop.location = 'Nagpur'
+            prop.save()
+        self.assertEqual(self.suggestions(), [('Nagpur', 1)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            prop.title = 'Renamed'
+            prop.save()
+        self.assertEqual(self.suggestions(), [('Nagpur', 1)])
+
+    def test_sold_listings_are_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            prop = make_property(location='Pune')
+            make_property(location='Nagpur', is_sold=True)
+        self.assertEqual(self.suggestions(), [('Pune', 1)])
+        with self.captureOnCommitCallbacks(execute=True):
+            prop.is_sold = True
+            prop.save()
+        self.assertEqual(self.suggestions(), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            prop.is_sold = False
+            prop.save()
+        self.assertEqual(self.suggestions(), [('Pune', 1)])
+
+    def test_deletes_remove_the_listing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            prop = make_property(location='Pune')
+            sold = make_property(location='Pune', is_sold=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            sold.delete()
+        self.assertEqual(self.suggestions(), [('Pune', 1)])
+        with self.captureOnCommitCallbacks(execute=True):
+            prop.delete()
+        self.assertEqual(self.suggestions(), [])
+
+    def test_saves_without_the_previous_state_are_left_to_the_rebuild(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            prop = make_property(location='Pune')
+        prop = Property.objects.only('pk', 'title').get(pk=prop.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            prop.location = 'Nagpur'
+            prop.save()
+        self.assertEqual(self.suggestions(), [('Pune', 1)])
+
+
+class SuggestLocationsViewTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(views, 'location_index', built_index([('Pune', 3), ('Punjab', 5)]))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+
+    def test_suggestions(self):
+        response = self.client.get(reverse('location-suggest'), {'q': 'pun', 'limit': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{'location': 'Punjab', 'count': 5}])
+
+    def test_limit_must_be_an_integer(self):
+        response = self.client.get(reverse('location-suggest'), {'q': 'pun', 'limit': 'all'})
+        self.assertEqual(response.status_code, 400)
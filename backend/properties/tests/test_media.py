@@ -0,0 +1,140 @@
+import io
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from properties.media import build_srcset, is_hashed
+from properties.models import ImageBlob, Property
+
+from .factories import make_property
+
+
+def image_bytes(size=(1600, 1200), image_format='JPEG', color='navy'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, image_format)
+    return buffer.getvalue()
+
+
+class MediaTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings = override_settings(MEDIA_ROOT=self.media_root, MEDIA_IMAGE_WIDTHS=[320, 640])
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def upload(self, data=None, name='house.jpg'):
+        return make_property(image=SimpleUploadedFile(name, data or image_bytes(), content_type='image/jpeg'))
+
+    def exists(self, name):
+        return os.path.isfile(os.path.join(self.media_root, name))
+
+
+class ImageStorageTests(MediaTestCase):
+    def test_upload_is_resized_hashed_and_gets_variants(self):
+        prop = self.upload()
+        self.assertTrue(is_hashed(prop.image.name))
+        self.assertEqual(prop.image_widths, [320, 640, 800])
+        with Image.open(prop.image.path) as img:
+            self.assertEqual(img.size, (800, 600))
+        for width in (320, 640):
+            self.assertTrue(self.exists(prop.image.name.replace('.jpg', f'_{width}w.jpg')))
+
+    def test_srcset_lists_every_width(self):
+        prop = self.upload()
+        url = prop.image.url
+        self.assertEqual(
+            build_srcset(prop.image, prop.image_widths),
+            f"{url.replace('.jpg', '_320w.jpg')} 320w, {url.replace('.jpg', '_640w.jpg')} 640w, {url} 800w",
+        )
+        self.assertIsNone(build_srcset(None, []))
+
+    def test_identical_uploads_share_one_blob(self):
+        data = image_bytes()
+        first, second = self.upload(data), self.upload(data, name='copy.jpg')
+        self.assertEqual(first.image_blob_id, second.image_blob_id)
+        self.assertEqual(ImageBlob.objects.get().ref_count, 2)
+
+    def test_files_are_deleted_with_the_last_reference(self):
+        data = image_bytes()
+        first, second = self.upload(data), self.upload(data)
+        name = first.image.name
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(self.exists(name))
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(self.exists(name))
+        self.assertFalse(ImageBlob.objects.exists())
+
+
+class ServeMediaTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.prop = self.upload()
+        self.url = self.prop.image.url
+        with open(self.prop.image.path, 'rb') as handle:
+            self.body = handle.read()
+
+    def test_hashed_files_are_cached_for_good(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.body)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_conditional_request(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_range_requests(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), self.body[10:20])
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.body)}')
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-5')
+        self.assertEqual(b''.join(response.streaming_content), self.body[-5:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.body)}-')
+        self.assertEqual(response.status_code, 416)
+
+        # A stale If-Range gets the whole file
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"other"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_transfer_can_be_handed_to_the_front_server(self):
+        with override_settings(MEDIA_SERVE_BACKEND='x-accel-redirect'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/' + self.prop.image.name)
+        self.assertEqual(response.content, b'')
+
+    def test_missing_and_outside_paths_are_not_found(self):
+        self.assertEqual(self.client.get('/media/properties/missing.jpg').status_code, 404)
+        self.assertEqual(self.client.get('/media/../settings.py').status_code, 404)
+        self.assertEqual(self.client.post(self.url).status_code, 405)
+
+
+class BackfillImagesTests(MediaTestCase):
+    def test_legacy_images_are_restored(self):
+        legacy = FileSystemStorage(location=self.media_root).save('properties/legacy.png', io.BytesIO(image_bytes(image_format='PNG')))
+        prop = make_property()
+        Property.objects.filter(pk=prop.pk).update(image=legacy)
+
+        call_command('backfill_property_images', stdout=StringIO())
+        prop.refresh_from_db()
+        self.assertTrue(is_hashed(prop.image.name))
+        self.assertEqual(prop.image_widths, [320, 640, 800])
+        self.assertEqual(prop.image_blob.ref_count, 1)
+        self.assertFalse(self.exists(legacy))
+
+        # Re-running skips rows that already have a blob
+        call_command('backfill_property_images', stdout=StringIO())
+        self.assertEqual(ImageBlob.objects.get().ref_count, 1)
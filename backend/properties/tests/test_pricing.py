@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+
+from properties.models import PropertyPriceChange
+from properties.pricing import downsample
+
+from .factories import make_property
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def series(prices):
+    return [(START + timedelta(days=i), Decimal(price)) for i, price in enumerate(prices)]
+
+
+class DownsampleTests(SimpleTestCase):
+    def test_short_series_is_returned_whole(self):
+        points = series([5, 4, 6])
+        self.assertEqual([p['price'] for p in downsample(points, 3)], [5, 4, 6])
+
+    def test_buckets_keep_last_low_and_high(self):
+        result = downsample(series([10, 2, 8, 7, 9, 6]), 2)
+        self.assertEqual(
+            [(p['price'], p['low'], p['high']) for p in result],
+            [(Decimal(8), Decimal(2), Decimal(10)), (Decimal(6), Decimal(6), Decimal(9))],
+        )
+
+    def test_streamed_points_match_a_list(self):
+        points = series(range(100, 0, -1))
+        self.assertEqual(
+            downsample(iter(points), 7, points[0][0], points[-1][0]),
+            downsample(points, 7),
+        )
+
+
+class PriceHistoryViewTests(APITestCase):
+    def setUp(self):
+        self.property = make_property(price=1000)
+        for price in (900, 950, 800):
+            self.property.price = price
+            self.property.save()
+        self.url = f'/api/properties/{self.property.pk}/price-history/'
+
+    def test_history_is_recorded_and_returned_oldest_first(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['price'] for p in response.data['points']], ['1000.00', '900.00', '950.00', '800.00'])
+        drops = PropertyPriceChange.objects.filter(is_drop=True).values_list('price', flat=True)
+        self.assertEqual(sorted(drops), [Decimal(800), Decimal(900)])
+
+    def test_points_downsamples(self):
+        response = self.client.get(self.url, {'points': 2})
+        points = response.data['points']
+        self.assertEqual(len(points), 2)
+        self.assertEqual(points[-1]['price'], '800.00')
+        self.assertEqual(min(p['low'] for p in points), '800.00')
+
+    def test_range_filters(self):
+        changes = list(PropertyPriceChange.objects.filter(property=self.property).order_by('changed_at'))
+        response = self.client.get(self.url, {'since': changes[1].changed_at.isoformat(), 'until': changes[2].changed_at.isoformat()})
+        self.assertEqual([p['price'] for p in response.data['points']], ['900.00', '950.00'])
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in ({'since': 'yesterday'}, {'since': '2024-02-30T00:00:00'}, {'until': '2024-13-01T00:00:00'}, {'points': 'many'}):
+            self.assertEqual(self.client.get(self.url, params).status_code, 400, params)
+
+    def test_unknown_property(self):
+        self.assertEqual(self.client.get('/api/properties/999999/price-history/').status_code, 404)
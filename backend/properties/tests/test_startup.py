@@ -0,0 +1,52 @@
+import subprocess
+import sys
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+from properties.management.commands.profile_startup import parse_importtime
+
+# Modules the web entrypoints should only load on first use
+DEFERRED_MODULES = ['PIL', 'rest_framework_simplejwt.models', 'django.test']
+
+
+class LazyImportTests(SimpleTestCase):
+    def loaded_after(self, statement):
+        probe = f'import sys\n{statement}\nprint(",".join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))'
+        result = subprocess.run([sys.executable, '-c', probe], cwd=settings.BASE_DIR, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return result.stdout.strip()
+
+    def test_wsgi_defers_pillow_and_simplejwt(self):
+        self.assertEqual(self.loaded_after('import backend.wsgi'), '')
+
+    def test_models_and_media_do_not_load_pillow(self):
+        statement = 'import backend.wsgi, properties.models, properties.media'
+        self.assertEqual(self.loaded_after(statement), '')
+
+
+class ProfileStartupTests(SimpleTestCase):
+    def test_parse_importtime(self):
+        stderr = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |   _io\n'
+            'import time:      2500 |       4100 | django.db\n'
+            'unrelated line\n'
+        )
+        self.assertEqual(parse_importtime(stderr), {'_io': (120, 120), 'django.db': (2500, 4100)})
+
+    def test_reports_each_entrypoint_and_app(self):
+        out = StringIO()
+        call_command('profile_startup', runs=1, top=3, budget=60000, stdout=out)
+        output = out.getvalue()
+        for name in ['wsgi', 'asgi', 'manage']:
+            self.assertIn(f'{name}: median', output)
+        self.assertIn('import time by top-level package', output)
+        self.assertIn('properties', output.split('App setup')[1])
+        self.assertIn('All entrypoints within budget', output)
+
+    def test_over_budget_fails(self):
+        with self.assertRaisesMessage(CommandError, 'Startup over budget (1 ms): wsgi, asgi, manage'):
+            call_command('profile_startup', runs=1, budget=1, stdout=StringIO())
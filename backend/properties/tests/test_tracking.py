@@ -0,0 +1,91 @@
+import os
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from properties import tracking
+from properties.archive import archive_sold_properties
+from properties.models import ArchivedProperty, PropertyViewCount
+from properties.tracking import ViewTracker, viewer_key
+
+from .factories import make_property
+
+
+def tracker():
+    view_tracker = ViewTracker()
+    # Flushed by hand; no background thread
+    view_tracker._pid = os.getpid()
+    return view_tracker
+
+
+@override_settings(PROPERTY_VIEWS_DEDUP_WINDOW=60)
+class ViewTrackerTests(TestCase):
+    def test_repeat_views_within_the_window_count_once(self):
+        views = tracker()
+        with mock.patch.object(tracking.time, 'monotonic', return_value=1000):
+            self.assertTrue(views.record(1, 'a'))
+            self.assertFalse(views.record(1, 'a'))
+            self.assertTrue(views.record(1, 'b'))
+            self.assertTrue(views.record(2, 'a'))
+        with mock.patch.object(tracking.time, 'monotonic', return_value=1061):
+            self.assertTrue(views.record(1, 'a'))
+        self.assertEqual((views.pending(1), views.pending(2)), (3, 1))
+
+    def test_expired_viewers_are_dropped_as_views_come_in(self):
+        views = tracker()
+        with mock.patch.object(tracking.time, 'monotonic', return_value=1000):
+            for viewer in 'abc':
+                views.record(1, viewer)
+        with mock.patch.object(tracking.time, 'monotonic', return_value=1061):
+            views.record(1, 'd')
+        self.assertEqual(list(views._seen), [(1, 'd')])
+
+    def test_seen_viewers_are_capped(self):
+        views = tracker()
+        views.max_seen = 2
+        for viewer in 'abc':
+            views.record(1, viewer)
+        self.assertEqual(list(views._seen), [(1, 'b'), (1, 'c')])
+
+    def test_flush_writes_counts_including_archived_properties(self):
+        active, sold = make_property(), make_property(is_sold=True)
+        views = tracker()
+        views.record(sold.pk, 'a')
+        views.flush()
+        for viewer in 'ab':
+            views.record(active.pk, viewer)
+        views.record(sold.pk, 'b')
+        list(archive_sold_properties(older_than_days=0))
+
+        self.assertEqual(views.flush(), 2)
+        self.assertEqual(PropertyViewCount.objects.get(property=active).views, 2)
+        self.assertEqual(ArchivedProperty.objects.get(pk=sold.pk).views, 2)
+
+    def test_failed_flush_keeps_the_counts(self):
+        prop = make_property()
+        views = tracker()
+        views.record(prop.pk, 'a')
+        with mock.patch.object(ViewTracker, '_write_batch', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                views.flush()
+        self.assertEqual(views.pending(prop.pk), 1)
+        views.flush()
+        self.assertEqual(PropertyViewCount.objects.get(property=prop).views, 1)
+
+
+class ViewerKeyTests(TestCase):
+    def request(self, forwarded_for, agent='Browser/1.0'):
+        return APIRequestFactory().get(
+            '/', HTTP_X_FORWARDED_FOR=forwarded_for, REMOTE_ADDR='10.0.0.1', HTTP_USER_AGENT=agent
+        )
+
+    def test_anonymous_viewers_are_told_apart_by_client_address(self):
+        # Every request arrives from the proxy's address; the proxy appends the client's
+        self.assertNotEqual(viewer_key(self.request('203.0.113.7')), viewer_key(self.request('203.0.113.8')))
+
+    def test_spoofed_forwarded_for_does_not_make_a_new_viewer(self):
+        self.assertEqual(
+            viewer_key(self.request('1.1.1.1, 203.0.113.7')), viewer_key(self.request('2.2.2.2, 203.0.113.7'))
+        )
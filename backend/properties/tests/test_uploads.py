@@ -0,0 +1,107 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.test import override_settings
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from properties.models import ImageBlob, UploadSession
+from properties.uploads import complete_upload, lock_file
+
+from .factories import make_user
+
+
+def png_bytes():
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8), 'red').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class ChunkedUploadTests(APITestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        self.temp_dir = os.path.join(root, 'tmp')
+        settings = override_settings(MEDIA_ROOT=os.path.join(root, 'media'), UPLOAD_TEMP_DIR=self.temp_dir)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client.force_authenticate(make_user())
+        self.image = png_bytes()
+
+    def start(self, data=None):
+        response = self.client.post('/api/properties/uploads/', {'filename': 'photo.png', 'size': len(data or self.image)})
+        self.assertEqual(response.status_code, 201)
+        return f'/api/properties/uploads/{response.data["id"]}/'
+
+    def put(self, url, offset, body):
+        return self.client.generic('PUT', url, body, content_type='application/octet-stream', HTTP_UPLOAD_OFFSET=str(offset))
+
+    def test_resume_after_an_interrupted_chunk(self):
+        url = self.start()
+        half = len(self.image) // 2
+        self.assertEqual(self.put(url, 0, self.image[:half]).data['offset'], half)
+
+        # The client lost the response and asks where to resume from
+        self.assertEqual(self.client.get(url).data['offset'], half)
+        response = self.put(url, 0, self.image)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['offset'], half)
+
+        self.assertEqual(self.put(url, half, self.image[half:]).data['offset'], len(self.image))
+        response = self.client.post(url + 'complete/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['complete'])
+        blob = ImageBlob.objects.get()
+        with blob.file.open('rb') as handle:
+            self.assertEqual(handle.read(), self.image)
+
+    def test_chunk_past_the_declared_size_is_rejected(self):
+        url = self.start()
+        response = self.put(url, 0, self.image + b'extra')
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(self.client.get(url).data['offset'], 0)
+
+    def test_chunk_is_refused_while_another_is_being_written(self):
+        url = self.start()
+        os.makedirs(self.temp_dir)
+        with open(UploadSession.objects.get().temp_path, 'a+b') as handle:
+            self.assertTrue(lock_file(handle))
+            self.assertEqual(self.put(url, 0, self.image).status_code, 409)
+        self.assertEqual(self.put(url, 0, self.image).status_code, 200)
+
+    def test_incomplete_upload_cannot_be_completed(self):
+        url = self.start()
+        self.put(url, 0, self.image[:10])
+        response = self.client.post(url + 'complete/')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['offset'], 10)
+
+    def test_double_complete_returns_the_same_blob(self):
+        url = self.start()
+        self.put(url, 0, self.image)
+        first = self.client.post(url + 'complete/')
+        second = self.client.post(url + 'complete/')
+        self.assertEqual((first.status_code, second.status_code), (200, 200))
+        self.assertEqual(ImageBlob.objects.count(), 1)
+
+    def test_concurrent_completions_are_serialized(self):
+        url = self.start()
+        self.put(url, 0, self.image)
+        # Both requests read the session before either attached a blob
+        first, second = UploadSession.objects.get(), UploadSession.objects.get()
+        blob = complete_upload(first)
+        self.assertEqual(complete_upload(second), blob)
+        self.assertEqual(UploadSession.objects.get().blob, blob)
+        self.assertFalse(os.path.exists(first.temp_path))
+
+    def test_invalid_image_is_rejected_and_discarded(self):
+        data = b'not an image at all'
+        url = self.start(data)
+        self.put(url, 0, data)
+        response = self.client.post(url + 'complete/')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertFalse(ImageBlob.objects.exists())
+        self.assertEqual(os.listdir(self.temp_dir), [])
@@ -0,0 +1,160 @@
+import atexit
+import hashlib
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, models, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from backend.throttling import client_ip
+
+from .models import ArchivedProperty, Property, PropertyViewCount
+
+
+def viewer_key(request):
+    """
+    Identify a viewer for de-duplication: the user id, or a hash of the
+    client address (as the throttles see it, behind the proxy) and agent.
+    """
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'u{user.pk}'
+    raw = f"{client_ip(request) or ''}|{request.META.get('HTTP_USER_AGENT', '')}"
+    return 'a' + hashlib.blake2b(raw.encode(), digest_size=8).hexdigest()
+
+
+def increments(deltas, ids, field):
+    """A CASE expression giving each row's delta, for one UPDATE of many counters."""
+    return Case(
+        *[When(**{field: pk}, then=Value(deltas[pk])) for pk in ids],
+        default=Value(0),
+        output_field=models.PositiveBigIntegerField(),
+    )
+
+
+class ViewTracker:
+    """
+    Per-process property view counter. Views are de-duplicated per viewer
+    over a time window and kept in memory; a background thread periodically
+    writes the accumulated deltas to PropertyViewCount in batched upserts,
+    so a detail GET never writes to the database itself.
+
+    Recent (property, viewer) pairs are kept in expiry order; expired pairs
+    are dropped as new views come in, and the oldest once there are more
+    than max_seen, so memory stays bounded between flushes.
+    """
+    max_seen = 100000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._seen = OrderedDict()
+        self._pid = None
+        self._thread = None
+
+    def record(self, property_id, viewer):
+        now = time.monotonic()
+        key = (property_id, viewer)
+        with self._lock:
+            self._ensure_flusher()
+            expires = self._seen.get(key)
+            if expires is not None and expires > now:
+                return False
+            # Every pair gets the same window, so insertion order is expiry order
+            self._seen[key] = now + settings.PROPERTY_VIEWS_DEDUP_WINDOW
+            self._seen.move_to_end(key)
+            while self._seen:
+                oldest = next(iter(self._seen.values()))
+                if oldest > now and len(self._seen) <= self.max_seen:
+                    break
+                self._seen.popitem(last=False)
+            self._pending[property_id] += 1
+        return True
+
+    def pending(self, property_id):
+        return self._pending.get(property_id, 0)
+
+    def flush(self):
+        """Write pending deltas to the database. Returns the number of properties updated."""
+        with self._lock:
+            deltas, self._pending = self._pending, Counter()
+        if not deltas:
+            return 0
+
+        items = list(deltas.items())
+        batch_size = settings.PROPERTY_VIEWS_BATCH_SIZE
+        written = 0
+        for start in range(0, len(items), batch_size):
+            batch = dict(items[start:start + batch_size])
+            try:
+                written += self._write_batch(batch)
+            except DatabaseError:
+                # Keep the counts for the next flush rather than dropping them
+                with self._lock:
+                    self._pending.update(batch)
+                    for property_id, delta in items[start + batch_size:]:
+                        self._pending[property_id] += delta
+                raise
+        return written
+
+    def _write_batch(self, batch):
+        with transaction.atomic():
+            property_ids = list(Property.objects.filter(pk__in=batch).values_list('pk', flat=True))
+            written = 0
+            if len(property_ids) < len(batch):
+                # Archived since they were viewed: the count moved to the archived
+                # copy. Properties deleted outright are skipped.
+                archived_ids = list(
+                    ArchivedProperty.objects.filter(pk__in=set(batch).difference(property_ids))
+                    .values_list('pk', flat=True)
+                )
+                if archived_ids:
+                    written += ArchivedProperty.objects.filter(pk__in=archived_ids).update(
+                        views=F('views') + increments(batch, archived_ids, 'pk')
+                    )
+            if not property_ids:
+                return written
+            PropertyViewCount.objects.bulk_create(
+                [PropertyViewCount(property_id=property_id) for property_id in property_ids],
+                ignore_conflicts=True,
+            )
+            return written + PropertyViewCount.objects.filter(property_id__in=property_ids).update(
+                views=F('views') + increments(batch, property_ids, 'property_id'), updated_at=timezone.now()
+            )
+
+    def _ensure_flusher(self):
+        # Called with the lock held; restarts the thread in forked workers
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        self._pid = pid
+        self._pending = Counter()
+        self._seen = OrderedDict()
+        self._thread = threading.Thread(target=self._run, name='property-view-flusher', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(settings.PROPERTY_VIEWS_FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except DatabaseError:
+                pass
+            finally:
+                close_old_connections()
+
+
+view_tracker = ViewTracker()
+
+
+@atexit.register
+def _flush_on_exit():
+    if view_tracker._pending:
+        try:
+            view_tracker.flush()
+        except DatabaseError:
+            pass
@@ -0,0 +1,165 @@
+import os
+from datetime import timedelta
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .media import STREAM_CHUNK_SIZE, InvalidImage, verify_image
+from .models import ImageBlob, UploadSession
+
+
+class UploadOverflow(Exception):
+    pass
+
+
+class UploadConflict(Exception):
+    """The chunk cannot be written at the client's offset; ``offset`` is where the upload stands."""
+
+    def __init__(self, message, offset):
+        super().__init__(message)
+        self.offset = offset
+
+
+def lock_file(handle, blocking=True):
+    """
+    Take an exclusive lock on an open file, released when it is closed.
+    Returns False if ``blocking`` is off and another handle holds the lock.
+    """
+    if fcntl is not None:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            return False
+        return True
+    # msvcrt locks a byte range from the current position; LK_LOCK gives up after ten seconds
+    handle.seek(0)
+    try:
+        msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+    except OSError:
+        if blocking:
+            raise
+        return False
+    return True
+
+
+def append_chunk(session, offset, stream):
+    """
+    Append the request body to the session's temporary file at ``offset``,
+    reading and writing STREAM_CHUNK_SIZE bytes at a time, and advance
+    session.received. Returns the new offset.
+
+    No transaction or row lock is held while the body streams: an exclusive
+    lock on the temporary file keeps out other chunks of the same upload,
+    the offset is checked once that lock is held, and received is advanced
+    with an UPDATE conditional on it still being ``offset``. Anything past
+    the offset left by an interrupted chunk is discarded first.
+    """
+    os.makedirs(settings.UPLOAD_TEMP_DIR, exist_ok=True)
+    sessions = UploadSession.objects.filter(pk=session.pk)
+    with open(session.temp_path, 'a+b') as handle:
+        if not lock_file(handle, blocking=False):
+            raise UploadConflict('Another chunk of this upload is being written', offset)
+        current = sessions.values('received', 'blob_id').first()
+        if current is None:
+            raise UploadConflict('Upload was abandoned', offset)
+        if current['blob_id'] is not None:
+            raise UploadConflict('Upload already completed', current['received'])
+        if current['received'] != offset:
+            raise UploadConflict('Offset mismatch', current['received'])
+
+        remaining = session.size - offset
+        written = 0
+        handle.truncate(offset)
+        while stream is not None:
+            chunk = stream.read(min(STREAM_CHUNK_SIZE, remaining - written + 1))
+            if not chunk:
+                break
+            if written + len(chunk) > remaining:
+                handle.truncate(offset)
+                raise UploadOverflow(f'Upload is {session.size} bytes; chunk goes past the end')
+            handle.write(chunk)
+            written += len(chunk)
+        handle.flush()
+
+        if not sessions.filter(received=offset).update(received=F('received') + written, updated_at=timezone.now()):
+            handle.truncate(offset)
+            raise UploadConflict('Upload changed while the chunk was written', offset)
+    return offset + written
+
+
+def complete_upload(session):
+    """
+    Check the assembled file is an image, then hash it, resolve it to an
+    ImageBlob (storing it if it is new) and attach that to the session.
+    Returns the blob.
+
+    Runs under the same file lock as append_chunk, so a chunk still being
+    written is waited for, and a second completion of the same upload
+    returns the blob the first one attached instead of hashing again.
+    Raises UploadConflict if the upload is incomplete or was abandoned, and
+    InvalidImage, having removed the temporary file, if it is not an image.
+    """
+    os.makedirs(settings.UPLOAD_TEMP_DIR, exist_ok=True)
+    sessions = UploadSession.objects.filter(pk=session.pk)
+    finished = True
+    try:
+        with open(session.temp_path, 'a+b') as handle:
+            lock_file(handle)
+            current = sessions.values('received', 'blob_id').first()
+            if current is None:
+                raise UploadConflict('Upload was abandoned', session.received)
+            if current['blob_id'] is not None:
+                return ImageBlob.objects.get(pk=current['blob_id'])
+            if current['received'] != session.size:
+                finished = False
+                raise UploadConflict('Upload is incomplete', current['received'])
+            verify_image(handle)
+            blob = ImageBlob.for_file(handle, session.filename)
+            sessions.update(blob=blob, updated_at=timezone.now())
+            return blob
+    finally:
+        # Opening the file recreates it when an earlier call already removed it
+        if finished:
+            discard_upload(session)
+
+
+def discard_upload(session):
+    try:
+        os.remove(session.temp_path)
+    except FileNotFoundError:
+        pass
+
+
+def cleanup_uploads(max_age_hours=None):
+    """
+    Remove upload sessions untouched for max_age_hours along with their
+    temporary files, then blobs that were uploaded but never attached to a
+    property. Returns (sessions, blobs) removed.
+    """
+    hours = settings.UPLOAD_SESSION_MAX_AGE_HOURS if max_age_hours is None else max_age_hours
+    cutoff = timezone.now() - timedelta(hours=hours)
+    
+    stale = list(UploadSession.objects.filter(updated_at__lt=cutoff))
+    for session in stale:
+        discard_upload(session)
+    UploadSession.objects.filter(pk__in=[session.pk for session in stale]).delete()
+    
+    blobs = 0
+    orphan_ids = ImageBlob.objects.filter(ref_count=0, created_at__lt=cutoff, upload_sessions__isnull=True).values_list('pk', flat=True)
+    for blob_id in list(orphan_ids):
+        with transaction.atomic():
+            blob = ImageBlob.objects.select_for_update().filter(pk=blob_id, ref_count=0).first()
+            if blob is None:
+                continue
+            blob.delete()
+            transaction.on_commit(blob.delete_files)
+        blobs += 1
+    return len(stale), blobs
@@ -9,4 +9,11 @@ urlpatterns = [
     path('my-purchases/', views.my_purchases, name='my-purchases'),
     path('<int:property_id>/favorite/', views.toggle_favorite, name='toggle-favorite'),
     path('my-favorites/', views.my_favorites, name='my-favorites'),
+    path('<int:property_id>/price-history/', views.price_history, name='price-history'),
+    path('price-drops/', views.price_drops, name='price-drops'),
+    path('batch/', views.property_batch, name='property-batch'),
+    path('locations/suggest/', views.suggest_locations, name='location-suggest'),
+    path('uploads/', views.create_upload, name='create-upload'),
+    path('uploads/<uuid:upload_id>/', views.upload_session, name='upload-session'),
+    path('uploads/<uuid:upload_id>/complete/', views.complete_upload_session, name='complete-upload'),
 ]
@@ -1,18 +1,34 @@
 from rest_framework import generics, status, filters
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Max, Min, Q
+from django.db.models.functions import Coalesce
+from django.conf import settings
 from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
+from django.utils.dateparse import parse_datetime
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 import json
-from .models import Property, PropertyPurchase, PropertyFavorite
+from backend.renderers import FastJSONRenderer
+from .models import (
+    ArchivedProperty, Property, PropertyPurchase, PropertyFavorite, PropertyPriceChange, UploadSession
+)
 from .serializers import (
-    PropertySerializer, PropertyListSerializer, 
-    PropertyPurchaseSerializer, PropertyFavoriteSerializer
+    ArchivedPropertySerializer, PropertySerializer, PropertyListSerializer, 
+    PropertyPurchaseSerializer, PricePointSerializer, PriceDropSerializer,
+    UploadSessionSerializer
 )
+from .uploads import UploadConflict, UploadOverflow, append_chunk, complete_upload, discard_upload
+from .media import InvalidImage
+from .batch import load_properties
+from .locations import MAX_SUGGESTIONS, location_index
+from .rows import OwnerPropertyListRows, PropertyFavoriteRows, PropertyListRows
+from .pricing import downsample, recent_price_drops
+from .tracking import view_tracker, viewer_key
 from .filters import PropertyFilter
 
 class PropertyListCreateView(generics.ListCreateAPIView):
@@ -22,6 +38,7 @@ class PropertyListCreateView(generics.ListCreateAPIView):
     search_fields = ['title', 'description', 'location']
     ordering_fields = ['price', 'created_at', 'area']
     ordering = ['-created_at']
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
     
     def get_serializer_class(self):
         if self.request.method == 'GET':
@@ -46,9 +63,18 @@ class PropertyListCreateView(generics.ListCreateAPIView):
             queryset = queryset.filter(price__lte=max_price)
             
         return queryset
+    
+    def list(self, request, *args, **kwargs):
+        # Same output as PropertyListSerializer, built from value tuples; see properties.rows
+        rows = PropertyListRows(request)
+        queryset = self.filter_queryset(self.get_queryset()).values_list(*rows.columns)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(rows.serialize(page))
+        return Response(rows.serialize(queryset))
 
 class PropertyDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Property.objects.all()
+    queryset = Property.objects.select_related('owner').annotate(views=Coalesce('view_count__views', 0))
     serializer_class = PropertySerializer
     
     def get_permissions(self):
@@ -56,6 +82,20 @@ class PropertyDetailView(generics.RetrieveUpdateDestroyAPIView):
             return [AllowAny()]
         return [IsAuthenticated()]
     
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            response = super().retrieve(request, *args, **kwargs)
+        except Http404:
+            # Sold listings may have been moved to the archive
+            archived = get_object_or_404(ArchivedProperty.objects.select_related('owner'), pk=kwargs['pk'])
+            serializer = ArchivedPropertySerializer(archived, context=self.get_serializer_context())
+            return Response(serializer.data)
+        
+        # Counted in memory and flushed in batches; see properties.tracking
+        if settings.PROPERTY_VIEWS_ENABLED:
+            view_tracker.record(int(kwargs['pk']), viewer_key(request))
+        return response
+    
     def perform_update(self, serializer):
         # Only allow owner to update
         if serializer.instance.owner != self.request.user:
@@ -70,10 +110,14 @@ class PropertyDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@renderer_classes([FastJSONRenderer, BrowsableAPIRenderer])
 def my_properties(request):
-    properties = Property.objects.filter(owner=request.user)
-    serializer = PropertyListSerializer(properties, many=True)
-    return Response(serializer.data)
+    # Same output as OwnerPropertyListSerializer; see properties.rows
+    rows = OwnerPropertyListRows()
+    properties = Property.objects.filter(owner=request.user).annotate(
+        views=Coalesce('view_count__views', 0)
+    ).values_list(*rows.columns)
+    return Response(rows.serialize(properties))
 
 @csrf_exempt
 @api_view(['POST'])
@@ -134,20 +178,21 @@ def purchase_property(request, property_id):
         
         print(f"Creating purchase for property {property_id}")
         
-        # Create purchase request
-        purchase = PropertyPurchase.objects.create(
-            property=property_obj,
-            buyer=request.user,
-            purchase_price=property_obj.price,
-            notes=notes,
-            status='completed'  # Mark as completed immediately for demo
-        )
-        
-        print(f"Purchase created: {purchase.id}")
-        
-        # Mark property as sold
-        property_obj.is_sold = True
-        property_obj.save()
+        with transaction.atomic():
+            # Create purchase request
+            purchase = PropertyPurchase.objects.create(
+                property=property_obj,
+                buyer=request.user,
+                purchase_price=property_obj.price,
+                notes=notes,
+                status='completed'  # Mark as completed immediately for demo
+            )
+            
+            print(f"Purchase created: {purchase.id}")
+            
+            # Mark property as sold
+            property_obj.is_sold = True
+            property_obj.save()
         
         print(f"Property {property_id} marked as sold")
         
@@ -175,7 +220,9 @@ def purchase_property(request, property_id):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def my_purchases(request):
-    purchases = PropertyPurchase.objects.filter(buyer=request.user)
+    purchases = PropertyPurchase.objects.filter(buyer=request.user).select_related(
+        'buyer', 'property__owner', 'property__view_count', 'archived_property__owner'
+    )
     serializer = PropertyPurchaseSerializer(purchases, many=True)
     return Response(serializer.data)
 
@@ -211,7 +258,156 @@ def toggle_favorite(request, property_id):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@renderer_classes([FastJSONRenderer, BrowsableAPIRenderer])
 def my_favorites(request):
-    favorites = PropertyFavorite.objects.filter(user=request.user)
-    serializer = PropertyFavoriteSerializer(favorites, many=True)
+    # Same output as PropertyFavoriteSerializer; see properties.rows
+    rows = PropertyFavoriteRows()
+    favorites = PropertyFavorite.objects.filter(user=request.user).values_list(*rows.columns)
+    return Response(rows.serialize(favorites))
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def price_history(request, property_id):
+    """
+    Price history of one property, optionally limited to ?since=/&until=
+    (ISO 8601) and downsampled to at most ?points= entries.
+    """
+    # Sold listings may have been moved to the archive, along with their history
+    if Property.objects.filter(id=property_id).exists():
+        history = PropertyPriceChange.objects.filter(property_id=property_id)
+    elif ArchivedProperty.objects.filter(id=property_id).exists():
+        history = PropertyPriceChange.objects.filter(archived_property_id=property_id)
+    else:
+        raise Http404
+    try:
+        points = min(max(int(request.query_params.get('points', 100)), 1), 1000)
+    except ValueError:
+        return Response({'error': 'points must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    history = history.order_by('changed_at')
+    for param, lookup in (('since', 'changed_at__gte'), ('until', 'changed_at__lte')):
+        value = request.query_params.get(param)
+        if value:
+            try:
+                parsed = parse_datetime(value)
+            except ValueError:
+                # Well-formed but out of range, such as February 30th
+                parsed = None
+            if parsed is None:
+                return Response({'error': f'{param} must be an ISO 8601 datetime'}, status=status.HTTP_400_BAD_REQUEST)
+            history = history.filter(**{lookup: parsed})
+    
+    # The bounds come from the two ends of the (property, changed_at) index,
+    # so the rows themselves can be streamed through downsample
+    bounds = history.aggregate(first=Min('changed_at'), last=Max('changed_at'))
+    rows = history.values_list('changed_at', 'price').iterator(chunk_size=2000)
+    series = downsample(rows, points, bounds['first'], bounds['last'])
+    return Response({
+        'property_id': property_id,
+        'points': PricePointSerializer(series, many=True).data,
+    })
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def price_drops(request):
+    """Most recent price drops on unsold listings, newest first (?limit=, max 100)."""
+    try:
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    serializer = PriceDropSerializer(recent_price_drops(limit), many=True, context={'request': request})
     return Response(serializer.data)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def property_batch(request):
+    """
+    Several properties in one request, as the detail endpoint serializes
+    them: ?ids=3,1,2 (at most PROPERTY_BATCH_MAX_IDS). Results keep the
+    requested order; archived listings are included, and ids that do not
+    exist are listed under "missing".
+    """
+    try:
+        property_ids = [int(value) for value in request.query_params.get('ids', '').split(',') if value.strip()]
+    except ValueError:
+        return Response({'error': 'ids must be a comma-separated list of integers'}, status=status.HTTP_400_BAD_REQUEST)
+    property_ids = list(dict.fromkeys(property_ids))
+    if len(property_ids) > settings.PROPERTY_BATCH_MAX_IDS:
+        return Response({
+            'error': f'At most {settings.PROPERTY_BATCH_MAX_IDS} ids per request'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    results, missing = load_properties(property_ids, request)
+    return Response({'results': results, 'missing': missing})
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def suggest_locations(request):
+    """Locations starting with ?q=, most listed first (?limit=, max 20). Served from memory."""
+    try:
+        limit = min(max(int(request.query_params.get('limit', 10)), 1), MAX_SUGGESTIONS)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    suggestions = location_index.suggest(request.query_params.get('q', ''), limit)
+    return Response([{'location': location, 'count': count} for location, count in suggestions])
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def create_upload(request):
+    """Start a chunked image upload: {"filename": ..., "size": <bytes>}."""
+    serializer = UploadSessionSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    serializer.save(owner=request.user)
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+@api_view(['GET', 'PUT', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def upload_session(request, upload_id):
+    """
+    GET reports the offset to resume from. PUT appends the raw request body
+    at the offset given in the Upload-Offset header. DELETE abandons the
+    upload.
+    """
+    session = get_object_or_404(UploadSession, pk=upload_id, owner=request.user)
+    if request.method == 'GET':
+        return Response(UploadSessionSerializer(session).data)
+    
+    if request.method == 'DELETE':
+        discard_upload(session)
+        session.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    try:
+        offset = int(request.headers.get('Upload-Offset', ''))
+    except ValueError:
+        return Response({'error': 'Upload-Offset header is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        session.received = append_chunk(session, offset, request.stream)
+    except UploadConflict as e:
+        return Response({'error': str(e), 'offset': e.offset}, status=status.HTTP_409_CONFLICT)
+    except UploadOverflow as e:
+        return Response({'error': str(e), 'offset': offset}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+    return Response(UploadSessionSerializer(session).data)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def complete_upload_session(request, upload_id):
+    session = get_object_or_404(UploadSession, pk=upload_id, owner=request.user)
+    if session.blob_id is None:
+        if session.received != session.size:
+            return Response({
+                'error': 'Upload is incomplete',
+                'offset': session.received,
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            session.blob = complete_upload(session)
+        except UploadConflict as e:
+            return Response({'error': str(e), 'offset': e.offset}, status=status.HTTP_409_CONFLICT)
+        except InvalidImage:
+            # The temporary file is gone, so the upload cannot be resumed
+            session.delete()
+            return Response({'error': 'Upload is not a valid image'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(UploadSessionSerializer(session).data)
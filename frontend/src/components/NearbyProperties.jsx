@@ -80,6 +80,8 @@ const NearbyProperties = ({ currentProperty, radius = 10 }) => {
             {property.image ? (
               <img
                 src={property.image || "/placeholder.svg"}
+                srcSet={property.image_srcset || undefined}
+                sizes="(min-width: 768px) 33vw, 100vw"
                 alt={property.title}
                 className="w-full h-32 object-cover"
               />
@@ -172,6 +172,8 @@ const Profile = () => {
                 {property.image ? (
                   <img
                     src={property.image || "/placeholder.svg"}
+                    srcSet={property.image_srcset || undefined}
+                    sizes="(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw"
                     alt={property.title}
                     className="w-full h-48 object-cover"
                   />
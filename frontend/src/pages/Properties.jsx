@@ -318,6 +318,8 @@ const Properties = () => {
                   {property.image ? (
                     <img
                       src={property.image}
+                      srcSet={property.image_srcset || undefined}
+                      sizes={viewMode === "list" ? "(min-width: 768px) 33vw, 100vw" : "(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw"}
                       alt={property.title}
                       className={`w-full object-cover transition-transform duration-500 group-hover:scale-110 ${
                         viewMode === "list" ? "h-full" : "h-48"
@@ -140,6 +140,8 @@ const PropertyDetail = () => {
             {property.image ? (
               <img
                 src={property.image || "/placeholder.svg"}
+                srcSet={property.image_srcset || undefined}
+                sizes="(min-width: 1024px) 66vw, 100vw"
                 alt={property.title}
                 className={`w-full h-96 object-cover rounded-xl shadow-lg ${property.is_sold ? "filter grayscale" : ""}`}
               />